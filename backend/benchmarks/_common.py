@@ -0,0 +1,50 @@
+"""Shared helpers for the benchmark scripts"""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+
+# Benchmarks import backend modules the same way main.py does
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def start_smtp_sink(port: int) -> subprocess.Popen:
+    """Run smtp-debug-server.py on ``port`` in quiet mode, output discarded"""
+    script = os.path.join(REPO_DIR, "smtp-debug-server.py")
+    code = (
+        "import runpy, sys; "
+        f"runpy.run_path({script!r})['SimpleEmailLogger'](port={port}, quiet=True).start()"
+    )
+    proc = subprocess.Popen([sys.executable, "-c", code],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("localhost", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError(f"SMTP sink did not start on port {port}")
+
+
+def sample_recipients(count: int) -> list:
+    return [{
+        "email": f"owner{i}@roofer{i % 50}.com",
+        "business_name": f"Roofer {i}",
+        "owner_name": f"Owner {i}",
+        "city": "Houston",
+        "state": "TX",
+        "rating": 4.5
+    } for i in range(count)]
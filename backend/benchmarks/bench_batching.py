@@ -0,0 +1,50 @@
+"""
+Recipients/sec for a recipient-invariant template at several envelope
+batch sizes (1 = one SMTP transaction per recipient), against a local
+SMTP sink.
+
+    python benchmarks/bench_batching.py --recipients 5000 --batch-sizes 1 10 50 100
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from _common import free_port, sample_recipients, start_smtp_sink
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=5000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    port = free_port()
+    proc = start_smtp_sink(port)
+    os.environ["SMTP_PORT"] = str(port)
+    os.environ["SMTP_MAX_MESSAGES_PER_CONNECTION"] = "100000"
+    # Imported after SMTP_PORT is set so EmailService picks it up
+    from dispatcher import CampaignDispatcher
+    from email_service import EmailService
+
+    service = EmailService()
+    service.register_template("announcement", "<p>Our spring catalog is out.</p>", "Spring catalog")
+    recipients = sample_recipients(args.recipients)
+    try:
+        for batch_size in args.batch_sizes:
+            dispatcher = CampaignDispatcher(service, concurrency=args.concurrency, batch_size=batch_size)
+            before = service.pool_stats()["messages"]
+            started = time.perf_counter()
+            results = asyncio.run(dispatcher.dispatch(recipients, "announcement", collect_details=False))
+            elapsed = time.perf_counter() - started
+            envelopes = service.pool_stats()["messages"] - before
+            print(f"batch {batch_size:>4}: {results['sent'] / elapsed:9.0f} recipients/s  "
+                  f"({envelopes} envelopes, {results['failed']} failed)")
+    finally:
+        service.close()
+        proc.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Campaign recipient selection: the original
+``[lead for lead in leads if lead.id in lead_ids]`` scan vs
+``LeadStore.get_many``. The scan is O(leads x selected), so it is timed
+on a small slice of the selection and extrapolated.
+
+    python benchmarks/bench_campaign_lookup.py --leads 1000000 --selected 100000
+"""
+import argparse
+import random
+import time
+
+from _common import BACKEND_DIR  # noqa: F401  (puts backend/ on sys.path)
+from lead_store import LeadStore
+
+
+class BenchLead:
+    __slots__ = ("id", "city", "state", "industry")
+
+    def __init__(self, i: int):
+        self.id = f"LEAD-{i}"
+        self.city = "Houston"
+        self.state = "TX"
+        self.industry = "Roofing Contractors"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leads", type=int, default=1000000)
+    parser.add_argument("--selected", type=int, default=100000)
+    parser.add_argument("--scan-sample", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    leads = [BenchLead(i) for i in range(args.leads)]
+    store = LeadStore(leads)
+    lead_ids = [f"LEAD-{i}" for i in rng.sample(range(args.leads), args.selected)]
+    lead_ids += [f"MISSING-{i}" for i in range(100)]
+
+    sample = lead_ids[:args.scan_sample]
+    started = time.perf_counter()
+    [lead for lead in leads if lead.id in sample]
+    scan = (time.perf_counter() - started) * len(lead_ids) / len(sample)
+
+    started = time.perf_counter()
+    found, missing = store.get_many(lead_ids)
+    indexed = time.perf_counter() - started
+
+    print(f"{args.selected} selected IDs against {args.leads} leads")
+    print(f"    list scan (extrapolated): {scan:10.2f} s")
+    print(f"    LeadStore.get_many:       {indexed:10.4f} s  ({len(found)} found, {len(missing)} unknown)")
+
+
+if __name__ == "__main__":
+    main()
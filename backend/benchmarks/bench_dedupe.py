@@ -0,0 +1,131 @@
+"""
+Dedupe stage throughput plus precision/recall on a synthetic set where
+a known share of rows are perturbed copies of earlier businesses
+(re-cased and re-formatted contact fields, legal suffixes, typos).
+Then the cost of checking one lead as a single city's name index grows;
+it should follow the number of names sharing a band with the lead, not
+the size of the city.
+
+    python benchmarks/bench_dedupe.py --businesses 50000 --dup-rate 0.3
+    python benchmarks/bench_dedupe.py --city-sizes 10000,50000,100000,200000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from _common import BACKEND_DIR  # noqa: F401  (puts backend/ on sys.path)
+from dedupe import LeadDeduplicator, normalize_name
+from models import Lead
+
+WORDS = ["Elite", "Summit", "Premier", "Skyline", "Apex", "Guardian", "Heritage", "Precision",
+         "Dynasty", "Victory", "Crown", "Liberty", "Eagle", "Pioneer", "Lone Star", "Titan",
+         "Patriot", "Golden", "Iron", "Blue Sky", "Redline", "Northstar", "Cardinal", "Falcon"]
+KINDS = ["Roofing", "Roof Masters", "Roofing Co", "Roof Contractors", "Exteriors", "Roof & Gutter"]
+CITIES = [("Houston", "TX"), ("Dallas", "TX"), ("Austin", "TX"), ("Phoenix", "AZ"),
+          ("Atlanta", "GA"), ("Denver", "CO"), ("Tampa", "FL"), ("Nashville", "TN")]
+
+
+def base_lead(rng: random.Random, i: int) -> Lead:
+    city, state = rng.choice(CITIES)
+    coined = "".join(rng.choice("bcdfghjklmnprstvwz") + rng.choice("aeiou") for _ in range(3)).title()
+    name = f"{rng.choice(WORDS)} {coined} {rng.choice(KINDS)}"
+    slug = name.lower().replace(" ", "").replace("&", "")
+    return Lead(
+        id=f"LEAD-{i}", business_name=name, owner_name="Pat Lee",
+        phone=f"+1-{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+        email=f"info@{slug}.com", address="1 Main Street", city=city, state=state,
+        zip_code="77001", rating=4.5, reviews=10, website=f"www.{slug}.com", verified=True
+    )
+
+
+def perturb(rng: random.Random, lead: Lead, i: int) -> Lead:
+    digits = "".join(ch for ch in lead.phone if ch.isdigit())[1:]
+    name = lead.business_name
+    choice = rng.random()
+    if choice < 0.3:
+        name = name.upper() + " LLC"
+    elif choice < 0.6:
+        j = rng.randrange(len(name) - 1)
+        name = name[:j] + name[j + 1] + name[j] + name[j + 2:]
+    else:
+        name = "The " + name + ", Inc."
+    update = {"id": f"DUP-{i}", "business_name": name}
+    field = rng.random()
+    if field < 0.4:
+        update["phone"] = f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+        update["email"] = f"x{i}@other.com"
+        update["website"] = None
+    elif field < 0.7:
+        update["phone"] = "+1-000-000-0000"
+        update["email"] = lead.email.upper()
+        update["website"] = None
+    else:
+        # Only the (perturbed) name and city tie it to the original
+        update["phone"] = f"+1-999-{i % 1000:03d}-{i % 10000:04d}"
+        update["email"] = f"x{i}@other.com"
+        update["website"] = None
+    return lead.model_copy(update=update)
+
+
+def city_scaling(sizes, probes: int, seed: int):
+    """Microseconds per ``check`` against one city indexed with each of ``sizes`` names"""
+    rng = random.Random(seed)
+    deduplicator = LeadDeduplicator()
+    leads = [base_lead(rng, i).model_copy(update={"city": "Houston", "state": "TX"})
+             for i in range(max(sizes) + probes)]
+    names = deduplicator._city_names(leads[0])
+    for size in sizes:
+        grow = leads[len(names):size]
+        signatures = np.array([
+            deduplicator.hasher.signature(normalize_name(lead.business_name, lead.city)) for lead in grow
+        ], dtype=np.uint32).reshape(len(grow), deduplicator.num_perm)
+        names.add_many([lead.id for lead in grow], signatures)
+        started = time.perf_counter()
+        for lead in leads[size:size + probes]:
+            deduplicator.check(lead, count=False)
+        elapsed = time.perf_counter() - started
+        print(f"one city, {size:>7,} names: {elapsed / probes * 1e6:7.1f} us/lead")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--businesses", type=int, default=50000)
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--city-sizes", default="10000,50000,100000,200000",
+                        help="comma-separated name counts for the single-city check; empty to skip")
+    parser.add_argument("--probes", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    originals = [base_lead(rng, i) for i in range(args.businesses)]
+    rows, is_dup = [], []
+    for i, lead in enumerate(originals):
+        rows.append(lead)
+        is_dup.append(False)
+        if rng.random() < args.dup_rate:
+            rows.append(perturb(rng, originals[rng.randrange(i + 1)], i))
+            is_dup.append(True)
+    # Placeholder phones are shared on purpose; give the first one to nobody
+    deduplicator = LeadDeduplicator()
+    deduplicator.check(Lead(**{**originals[0].model_dump(), "id": "SEED", "business_name": "seed",
+                               "phone": "+1-000-000-0000", "email": "", "website": None}), count=False)
+
+    started = time.perf_counter()
+    flagged = [deduplicator.check(lead) is not None for lead in rows]
+    elapsed = time.perf_counter() - started
+
+    true_positive = sum(1 for f, d in zip(flagged, is_dup) if f and d)
+    precision = true_positive / max(1, sum(flagged))
+    recall = true_positive / max(1, sum(is_dup))
+    print(f"{len(rows)} rows ({sum(is_dup)} duplicates) in {elapsed:.2f}s: {len(rows) / elapsed:,.0f} rows/s")
+    print(f"precision {precision:.3f}  recall {recall:.3f}  {deduplicator.stats()}")
+
+    if args.city_sizes:
+        city_scaling(sorted(int(size) for size in args.city_sizes.split(",")), args.probes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
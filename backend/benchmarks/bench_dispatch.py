@@ -0,0 +1,54 @@
+"""
+Campaign dispatch throughput: sequential ``send_campaign`` vs the
+concurrent ``CampaignDispatcher`` at increasing worker counts, both
+sending to a local smtp-debug-server.py sink.
+
+    python benchmarks/bench_dispatch.py --messages 2000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from _common import free_port, sample_recipients, start_smtp_sink
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    port = free_port()
+    os.environ["SMTP_HOST"] = "localhost"
+    os.environ["SMTP_PORT"] = str(port)
+    sink = start_smtp_sink(port)
+
+    from email_service import EmailService
+    from dispatcher import CampaignDispatcher
+
+    recipients = sample_recipients(args.messages)
+    try:
+        service = EmailService()
+        started = time.perf_counter()
+        result = service.send_campaign(recipients, "intro")
+        elapsed = time.perf_counter() - started
+        service.close()
+        print(f"{'sequential':>14}: {result['sent'] / elapsed:10.1f} msg/s  ({result['failed']} failed)")
+
+        for concurrency in args.concurrency:
+            os.environ["SMTP_POOL_SIZE"] = str(concurrency)
+            service = EmailService()
+            dispatcher = CampaignDispatcher(service, concurrency=concurrency)
+            started = time.perf_counter()
+            result = asyncio.run(dispatcher.dispatch(recipients, "intro"))
+            elapsed = time.perf_counter() - started
+            service.close()
+            label = f"concurrency={concurrency}"
+            print(f"{label:>14}: {result['sent'] / elapsed:10.1f} msg/s  ({result['failed']} failed)")
+    finally:
+        sink.kill()
+
+
+if __name__ == "__main__":
+    main()
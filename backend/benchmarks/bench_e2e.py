@@ -0,0 +1,249 @@
+"""
+End-to-end API benchmark: runs main.py in-process against a synthetic
+lead database and a local SMTP sink, drives /api/scrape, /api/leads,
+/api/stats and /api/campaigns at each concurrency level, and prints the
+results as JSON (p50/p99 latency, throughput, memory) for comparing
+commits.
+
+Each dataset size runs in a fresh child process, because main.py loads
+its lead index at import time; memory figures are that process's. The
+scrape result cache is disabled unless --scrape-cache is given, so
+/api/scrape numbers measure the query path.
+
+    python benchmarks/bench_e2e.py --leads 10000 100000 --concurrency 1 8 32 --output e2e.json
+    python benchmarks/bench_e2e.py --leads 1000000 --requests 500 --campaign-size 5000
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from _common import REPO_DIR, free_port, start_smtp_sink
+
+ENDPOINTS = ("scrape", "leads", "stats")
+
+
+def rss_mb() -> float:
+    """Current resident set size, from /proc where available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1e3, 3)
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": percentile(50),
+        "p99_ms": percentile(99),
+        "max_ms": round(latencies[-1] * 1e3, 3) if latencies else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1e3, 3) if latencies else 0.0
+    }
+
+
+async def drive(client, make_request, requests: int, concurrency: int) -> dict:
+    """Issue ``requests`` calls from ``concurrency`` concurrent workers"""
+    latencies, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in remaining:
+            method, url, kwargs = make_request(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def request_factories(rng: random.Random, lead_count: int) -> dict:
+    from lead_generator import INDUSTRIES, STATE_CITIES
+
+    states = list(STATE_CITIES)
+
+    def scrape(i):
+        state = rng.choice(states)
+        # LeadStore matches a state code/name or a city name, not "City, ST"
+        location = state if rng.random() < 0.5 else rng.choice(STATE_CITIES[state])
+        return "POST", "/api/scrape", {"json": {
+            "location": location,
+            "industry": rng.choice(INDUSTRIES),
+            "limit": 50,
+            "rank": rng.random() < 0.5
+        }}
+
+    def leads(i):
+        return "GET", "/api/leads", {"params": {"limit": 100, "cursor": rng.randrange(lead_count)}}
+
+    def stats(i):
+        return "GET", "/api/stats", {}
+
+    return {"scrape": scrape, "leads": leads, "stats": stats}
+
+
+async def run_load(main, args, lead_count: int) -> dict:
+    import httpx
+
+    rng = random.Random(args.seed)
+    factories = request_factories(rng, lead_count)
+    lead_ids = [lead.id for _, lead in zip(range(100000), main.lead_store)]
+    results = {"endpoints": {}, "campaigns": {}}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name in ENDPOINTS:
+                results["endpoints"][name] = {}
+                for concurrency in args.concurrency:
+                    results["endpoints"][name][str(concurrency)] = await drive(
+                        client, factories[name], args.requests, concurrency
+                    )
+
+            for concurrency in args.concurrency:
+                def campaign(i):
+                    return "POST", "/api/campaigns", {"json": {
+                        "campaign_name": f"bench-{concurrency}-{i}",
+                        "template": args.template,
+                        "lead_ids": rng.sample(lead_ids, min(args.campaign_size, len(lead_ids)))
+                    }}
+
+                started = time.perf_counter()
+                api = await drive(client, campaign, args.campaigns, concurrency)
+                # Jobs leave campaign_jobs.jobs once their final counts are stored
+                while main.campaign_jobs.jobs:
+                    await asyncio.sleep(0.05)
+                elapsed = time.perf_counter() - started
+                campaigns = [c for c in main.database.list_campaigns()
+                             if c["name"].startswith(f"bench-{concurrency}-")]
+                sent = sum(c["emails_sent"] for c in campaigns)
+                failed = sum(c["emails_failed"] for c in campaigns)
+                results["campaigns"][str(concurrency)] = {
+                    "api": api,
+                    "emails_sent": sent,
+                    "emails_failed": failed,
+                    "emails_per_sec": round(sent / elapsed, 1),
+                    "seconds": round(elapsed, 3)
+                }
+    return results
+
+
+def run_dataset(lead_count: int, args, smtp_port: int) -> dict:
+    """Child process: build the dataset, import main.py, run the load"""
+    with tempfile.TemporaryDirectory(prefix="bench-e2e-") as tmp:
+        os.environ.update({
+            "DATABASE_PATH": os.path.join(tmp, "leads.db"),
+            "SMTP_PORT": str(smtp_port),
+            "SMTP_MAX_MESSAGES_PER_CONNECTION": "100000",
+            "SCRAPE_CACHE_TTL": os.environ.get("SCRAPE_CACHE_TTL", "300") if args.scrape_cache else "0",
+        })
+        from lead_generator import generate_lead_batches, write_database
+        from storage import Database
+
+        started = time.perf_counter()
+        database = Database(os.environ["DATABASE_PATH"])
+        write_database(generate_lead_batches(lead_count, seed=args.seed), database)
+        database.close()
+        generate_seconds = time.perf_counter() - started
+
+        baseline = rss_mb()
+        started = time.perf_counter()
+        import main
+        startup_seconds = time.perf_counter() - started
+        loaded = rss_mb()
+
+        results = asyncio.run(run_load(main, args, lead_count))
+        main.email_service.close()
+        main.database.close()
+    return {
+        "leads": lead_count,
+        "generate_seconds": round(generate_seconds, 3),
+        "startup_seconds": round(startup_seconds, 3),
+        "rss_mb_before_startup": round(baseline, 1),
+        "rss_mb_after_startup": round(loaded, 1),
+        "rss_mb_after_load": round(rss_mb(), 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        **results
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leads", type=int, nargs="+", default=[10000, 100000], help="dataset sizes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint and concurrency level")
+    parser.add_argument("--campaigns", type=int, default=4, help="campaigns per concurrency level")
+    parser.add_argument("--campaign-size", type=int, default=1000, help="recipients per campaign")
+    parser.add_argument("--template", default="intro")
+    parser.add_argument("--scrape-cache", action="store_true", help="keep the /api/scrape result cache on")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    smtp_port = free_port()
+    sink = start_smtp_sink(smtp_port)
+    context = multiprocessing.get_context("spawn")
+    try:
+        datasets = []
+        for lead_count in args.leads:
+            with context.Pool(1) as pool:
+                datasets.append(pool.apply(run_dataset, (lead_count, args, smtp_port)))
+    finally:
+        sink.kill()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": vars(args),
+        "datasets": datasets
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
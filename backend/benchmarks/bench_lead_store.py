@@ -0,0 +1,79 @@
+"""
+/api/scrape lookup cost: the original linear scan over every lead vs
+LeadStore's state/city/industry indexes, at several table sizes.
+
+    python benchmarks/bench_lead_store.py --sizes 10000 1000000 5000000
+"""
+import argparse
+import time
+
+from _common import BACKEND_DIR  # noqa: F401  (puts backend/ on sys.path)
+from lead_store import STATE_ABBREVIATIONS, LeadStore
+
+CITIES = [
+    ("Houston", "TX"), ("Dallas", "TX"), ("Austin", "TX"), ("Phoenix", "AZ"),
+    ("Atlanta", "GA"), ("Charlotte", "NC"), ("Jacksonville", "FL"), ("Nashville", "TN"),
+    ("Denver", "CO"), ("Portland", "OR"), ("Las Vegas", "NV"), ("Boise", "ID"),
+    ("Omaha", "NE"), ("Tulsa", "OK"), ("Buffalo", "NY"), ("Fresno", "CA")
+]
+INDUSTRIES = ["Roofing Contractors", "Plumbers", "Electricians", "HVAC"]
+
+
+class BenchLead:
+    """Stand-in for the pydantic Lead so millions of rows fit in memory"""
+    __slots__ = ("id", "city", "state", "industry")
+
+    def __init__(self, i: int):
+        self.id = f"LEAD-{i}"
+        self.city, self.state = CITIES[i % len(CITIES)]
+        self.industry = INDUSTRIES[(i // len(CITIES)) % len(INDUSTRIES)]
+
+
+def linear_scan(leads, location: str, limit: int):
+    """The pre-index filter from scrape_leads"""
+    location_lower = location.lower().strip()
+    state_code = STATE_ABBREVIATIONS.get(location_lower)
+    results = []
+    for lead in leads:
+        if (location_lower == lead.state.lower()
+                or location_lower in lead.city.lower()
+                or state_code == lead.state):
+            results.append(lead)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 1000000, 5000000])
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    # Fresno is the last city in the cycle and "Zzz" matches nothing,
+    # which is the worst case for the linear scan
+    queries = ["texas", "Fresno", "Zzz"]
+    for size in args.sizes:
+        leads = [BenchLead(i) for i in range(size)]
+        started = time.perf_counter()
+        store = LeadStore(leads)
+        build = time.perf_counter() - started
+        print(f"{size:>9} leads (index build {build:.2f}s)")
+        for location in queries:
+            scan_ms = timed(lambda: linear_scan(leads, location, args.limit), repeat=1 if size > 100000 else 5)
+            index_ms = timed(lambda: store.query(location, "Roofing", args.limit))
+            print(f"    {location:>8}: scan {scan_ms:10.3f} ms   index {index_ms:8.3f} ms")
+        del leads, store
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Memory and scan cost of the lead set: the original list of pydantic
+``Lead`` models vs LeadStore's columnar ``LeadTable``.
+
+Memory is traced allocation while loading each representation from the
+same generated batches. The filter is a full-table scan (verified leads
+in a state with rating >= 4.5), once over model attributes and once
+over the table's columns.
+
+    python benchmarks/bench_lead_table.py --count 500000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from _common import BACKEND_DIR  # noqa: F401  (puts backend/ on sys.path)
+from lead_generator import generate_lead_batches
+from lead_store import LeadStore
+from models import Lead
+from storage import LEAD_COLUMNS
+
+
+def traced(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size, elapsed
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def scan_models(leads, state: str, min_rating: float):
+    return [lead for lead in leads if lead.verified and lead.state == state and lead.rating >= min_rating]
+
+
+def scan_table(table, state: str, min_rating: float):
+    columns = table.columns
+    return [
+        position for position, (verified, lead_state, rating)
+        in enumerate(zip(columns["verified"], columns["state"], columns["rating"]))
+        if verified and lead_state == state and rating >= min_rating
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=500000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    def batches():
+        return generate_lead_batches(args.count, seed=args.seed)
+
+    def load_models():
+        return [
+            Lead(**dict(zip(LEAD_COLUMNS, row)))
+            for batch in batches() for row in zip(*(batch[c] for c in LEAD_COLUMNS))
+        ]
+
+    def load_store():
+        store = LeadStore()
+        for batch in batches():
+            store.add_many(
+                Lead.model_construct(**dict(zip(LEAD_COLUMNS, row)))
+                for row in zip(*(batch[c] for c in LEAD_COLUMNS))
+            )
+        return store
+
+    models, model_bytes, model_load = traced(load_models)
+    model_scan = timed(lambda: scan_models(models, "TX", 4.5))
+    matches = len(scan_models(models, "TX", 4.5))
+    del models
+
+    store, store_bytes, store_load = traced(load_store)
+    table_scan = timed(lambda: scan_table(store._table, "TX", 4.5))
+    assert len(scan_table(store._table, "TX", 4.5)) == matches
+
+    print(f"{args.count:,} leads, filter matches {matches:,}")
+    print(f"  list[Lead]:  {model_bytes / 2**20:8.1f} MiB  ({model_bytes / args.count:5.0f} B/lead)"
+          f"  load {model_load:6.1f}s  scan {model_scan:8.1f} ms")
+    print(f"  LeadStore:   {store_bytes / 2**20:8.1f} MiB  ({store_bytes / args.count:5.0f} B/lead)"
+          f"  load {store_load:6.1f}s  scan {table_scan:8.1f} ms   (includes indexes)")
+    print(f"  memory x{model_bytes / store_bytes:.1f} smaller, scan x{model_scan / table_scan:.1f} faster")
+
+
+if __name__ == "__main__":
+    main()
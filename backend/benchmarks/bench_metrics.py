@@ -0,0 +1,56 @@
+"""
+Cost of the built-in instrumentation: one histogram observation, one
+/metrics render with many labelled series, and the slowdown of a
+CPU-bound loop while the sampling profiler runs.
+
+    python benchmarks/bench_metrics.py --observations 1000000 --series 500
+"""
+import argparse
+import time
+
+from _common import BACKEND_DIR  # noqa: F401  (puts backend/ on sys.path)
+from metrics import Registry
+from profiler import SamplingProfiler
+
+
+def busy(n: int) -> float:
+    started = time.perf_counter()
+    total = 0
+    for i in range(n):
+        total += i * i % 7
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--observations", type=int, default=1000000)
+    parser.add_argument("--series", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=0.005, help="profiler sampling interval")
+    args = parser.parse_args()
+
+    registry = Registry()
+    histogram = registry.histogram("bench_seconds", "benchmark", ("route",))
+    started = time.perf_counter()
+    for i in range(args.observations):
+        histogram.observe(0.003, "/api/leads")
+    elapsed = time.perf_counter() - started
+    print(f"observe: {elapsed / args.observations * 1e9:7.0f} ns/observation")
+
+    for i in range(args.series):
+        histogram.observe(0.003, f"/route/{i}")
+    started = time.perf_counter()
+    text = registry.render()
+    elapsed = time.perf_counter() - started
+    print(f"render:  {elapsed * 1e3:7.2f} ms for {args.series} series ({len(text) / 1024:.0f} KiB)")
+
+    baseline = busy(3000000)
+    profiler = SamplingProfiler(interval=args.interval)
+    profiler.start()
+    profiled = busy(3000000)
+    profiler.stop()
+    print(f"profiler: {100 * (profiled / baseline - 1):+6.1f}% on a CPU-bound loop "
+          f"({profiler.samples} samples at {args.interval * 1e3:g} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+CPU per message: the MIMEMultipart/MIMEText path (built, then flattened
+the way ``send_message`` does) vs ``MessageBuilder`` bytes.
+
+Build-only numbers isolate the encoding work; ``--send`` also delivers
+every message over one pooled connection to a local SMTP sink and
+reports client CPU per message for both paths.
+
+    python benchmarks/bench_mime.py --messages 20000
+    python benchmarks/bench_mime.py --messages 2000 --send
+"""
+import argparse
+import io
+import os
+import time
+from datetime import datetime
+from email.generator import BytesGenerator
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from _common import free_port, sample_recipients, start_smtp_sink
+from email_service import EmailService
+
+
+def legacy_bytes(service: EmailService, template: str, recipient: dict) -> bytes:
+    """The pre-builder message, flattened like smtplib.send_message does"""
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = service.get_subject(template, recipient)
+    msg['From'] = service.from_email
+    msg['To'] = recipient["email"]
+    msg['Date'] = datetime.now().strftime("%a, %d %b %Y %H:%M:%S %z")
+    msg.attach(MIMEText(service.get_template(template, recipient), 'html'))
+    buffer = io.BytesIO()
+    BytesGenerator(buffer, False, policy=msg.policy.clone(linesep="\r\n")).flatten(msg)
+    return buffer.getvalue()
+
+
+def cpu_per_message(fn, recipients) -> float:
+    started = time.process_time()
+    for recipient in recipients:
+        fn(recipient)
+    return (time.process_time() - started) / len(recipients) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--send", action="store_true", help="also deliver to a local SMTP sink")
+    args = parser.parse_args()
+
+    proc = None
+    if args.send:
+        port = free_port()
+        proc = start_smtp_sink(port)
+        os.environ["SMTP_PORT"] = str(port)
+    service = EmailService()
+    recipients = sample_recipients(args.messages)
+
+    try:
+        for template in ("intro", "partnership"):
+            builder = service.message_builder(template)
+            legacy = cpu_per_message(lambda r: legacy_bytes(service, template, r), recipients)
+            built = cpu_per_message(lambda r: builder.build(r["email"], r), recipients)
+            print(f"{template:>12} build:  MIME {legacy:7.1f} us/msg   builder {built:6.1f} us/msg   x{legacy / built:.1f}")
+
+            if args.send:
+                def send_legacy(recipient):
+                    service.send_email(recipient["email"],
+                                       service.get_subject(template, recipient),
+                                       service.get_template(template, recipient))
+
+                def send_built(recipient):
+                    subject, message = builder.build(recipient["email"], recipient)
+                    service.send_message(recipient["email"], subject, message)
+
+                legacy = cpu_per_message(send_legacy, recipients)
+                built = cpu_per_message(send_built, recipients)
+                print(f"{template:>12} send:   MIME {legacy:7.1f} us/msg   builder {built:6.1f} us/msg   x{legacy / built:.1f}")
+    finally:
+        service.close()
+        if proc is not None:
+            proc.kill()
+
+
+if __name__ == "__main__":
+    main()
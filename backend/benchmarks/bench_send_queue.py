@@ -0,0 +1,51 @@
+"""
+Throughput of the durable campaign send queue in a temporary SQLite
+database: enqueueing recipients, and draining them (claim a chunk, then
+record its outcomes) at several claim sizes. No SMTP traffic; each drain
+cycle costs two committed transactions, which is the per-chunk overhead
+a campaign pays for being resumable.
+
+    python benchmarks/bench_send_queue.py --recipients 100000 --claim-sizes 50 500 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from _common import sample_recipients
+from storage import Database
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=100000)
+    parser.add_argument("--claim-sizes", type=int, nargs="+", default=[50, 500, 5000])
+    args = parser.parse_args()
+
+    recipients = sample_recipients(args.recipients)
+    result = {"status": "sent", "attempts": 1, "timestamp": "2026-01-01T00:00:00"}
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Database(os.path.join(tmp, "queue.db"))
+        for claim_size in args.claim_sizes:
+            campaign_id = f"CAMP-{claim_size}"
+            started = time.perf_counter()
+            added = database.enqueue_sends(campaign_id, recipients)
+            enqueue = time.perf_counter() - started
+
+            started = time.perf_counter()
+            drained = 0
+            while True:
+                claimed = database.claim_sends(campaign_id, claim_size)
+                if not claimed:
+                    break
+                database.record_sends(campaign_id, ((seq, result) for seq, _ in claimed))
+                drained += len(claimed)
+            drain = time.perf_counter() - started
+
+            print(f"claim {claim_size:>5}: enqueue {added / enqueue:9.0f} recipients/s   "
+                  f"drain {drained / drain:9.0f} recipients/s")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Load test for the local SMTP sink: several client processes, one SMTP
+session each, sending pre-built messages as fast as the sink accepts
+them.
+
+Starts smtp-debug-server.py in quiet mode unless --port points at a sink
+that is already running (e.g. an older version, for comparison).
+
+    python benchmarks/bench_smtp_sink.py --clients 1 8 32 --messages 500
+    python benchmarks/bench_smtp_sink.py --port 1025 --clients 16
+"""
+import argparse
+import multiprocessing
+import smtplib
+import time
+
+from _common import free_port, start_smtp_sink
+
+MESSAGE = (b"Subject: load test\r\nFrom: bench@localhost\r\nTo: sink@localhost\r\n\r\n"
+           + b"<p>" + b"x" * 1500 + b"</p>\r\n")
+
+
+def client(args) -> int:
+    port, messages, recipients = args
+    to_addrs = [f"rcpt{i}@localhost" for i in range(recipients)]
+    sent = 0
+    with smtplib.SMTP("localhost", port, timeout=60) as server:
+        for _ in range(messages):
+            server.sendmail("bench@localhost", to_addrs, MESSAGE)
+            sent += 1
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--messages", type=int, default=500, help="messages per client")
+    parser.add_argument("--recipients", type=int, default=1, help="RCPTs per message")
+    parser.add_argument("--port", type=int, help="use a sink that is already running")
+    args = parser.parse_args()
+
+    proc = None
+    port = args.port
+    if port is None:
+        port = free_port()
+        proc = start_smtp_sink(port)
+    try:
+        for clients in args.clients:
+            with multiprocessing.Pool(clients) as pool:
+                started = time.perf_counter()
+                sent = sum(pool.map(client, [(port, args.messages, args.recipients)] * clients))
+                elapsed = time.perf_counter() - started
+            print(f"{clients:>4} clients: {sent / elapsed:8.0f} msg/s  ({sent} messages in {elapsed:.2f}s)")
+    finally:
+        if proc is not None:
+            proc.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+SQLite bulk ingest throughput for Database.bulk_insert_leads.
+
+    python benchmarks/bench_storage.py --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from _common import BACKEND_DIR  # noqa: F401  (puts backend/ on sys.path)
+from storage import Database
+
+CITIES = [("Houston", "TX"), ("Dallas", "TX"), ("Phoenix", "AZ"), ("Denver", "CO")]
+
+
+def fake_leads(count: int):
+    for i in range(count):
+        city, state = CITIES[i % len(CITIES)]
+        yield SimpleNamespace(
+            id=f"LEAD-{i}", business_name=f"Roofer {i}", owner_name="John Smith",
+            phone="+1-555-555-5555", email=f"owner{i}@roofer.com", address="1 Main Street",
+            city=city, state=state, zip_code="77001", rating=3.5 + (i % 16) / 10,
+            reviews=i % 500, website=None, verified=i % 4 != 0, industry="Roofing Contractors"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Database(os.path.join(tmp, "bench.db"))
+        started = time.perf_counter()
+        written = database.bulk_insert_leads(fake_leads(args.rows), batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"ingest: {written} rows in {elapsed:.2f}s ({written / elapsed:,.0f} rows/s)")
+
+        started = time.perf_counter()
+        stats = database.lead_stats()
+        print(f"stats:  {stats} in {(time.perf_counter() - started) * 1000:.1f} ms")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Template rendering throughput: the compiled TemplateRegistry used by
+EmailService vs the original implementation that rebuilt every template
+f-string on each call. Rendering one template is about as fast either
+way for intro and partnership (0.9-1.3x across runs) and 1.6-2.0x for
+demo and followup; the legacy code also built the three unused ones.
+
+    python benchmarks/bench_templates.py --recipients 100000
+"""
+import argparse
+import time
+
+from _common import sample_recipients
+from templates import registry
+
+
+class LegacyTemplates:
+    """get_template/get_subject as they were before templates.py"""
+
+    def get_template(self, template_type: str, lead: dict) -> str:
+        """Get HTML email template"""
+        templates = {
+            "intro": f"""
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <h2 style="color: #6366f1;">Hello {lead.get('owner_name', 'there')}!</h2>
+                    <p>I noticed your business, <strong>{lead.get('business_name')}</strong>, and wanted to reach out.</p>
+                    <p>We specialize in providing cutting-edge solutions for roofing contractors like yourself.</p>
+                    <p>Would you be interested in a quick 15-minute call to discuss how we can help grow your business?</p>
+                    <br>
+                    <p>Best regards,<br>Your Name<br>Company Name</p>
+                    <hr style="border: 1px solid #eee; margin: 20px 0;">
+                    <p style="font-size: 12px; color: #888;">
+                        You received this email because your business is listed on Google Maps.
+                        <a href="#">Unsubscribe</a>
+                    </p>
+                </body>
+                </html>
+            """,
+            "partnership": f"""
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <h2 style="color: #6366f1;">Partnership Opportunity for {lead.get('business_name')}</h2>
+                    <p>Hi {lead.get('owner_name')},</p>
+                    <p>We're looking for top-rated roofing contractors to partner with in {lead.get('city')}, {lead.get('state')}.</p>
+                    <p>Your {lead.get('rating', 5.0)}⭐ rating caught our attention!</p>
+                    <p><strong>What we offer:</strong></p>
+                    <ul>
+                        <li>Exclusive lead generation</li>
+                        <li>Marketing support</li>
+                        <li>Technology solutions</li>
+                    </ul>
+                    <p>Interested? Let's schedule a call.</p>
+                    <br>
+                    <p>Best regards,<br>Partnership Team</p>
+                </body>
+                </html>
+            """,
+            "demo": f"""
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <h2 style="color: #6366f1;">Free Demo for {lead.get('business_name')}</h2>
+                    <p>Hi {lead.get('owner_name')},</p>
+                    <p>We have a powerful tool that's helping roofing contractors increase efficiency by 40%.</p>
+                    <p>I'd love to show you a quick demo - no commitment required.</p>
+                    <p><a href="#" style="background: #6366f1; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; display: inline-block;">Book Your Demo</a></p>
+                    <br>
+                    <p>Looking forward to connecting,<br>Sales Team</p>
+                </body>
+                </html>
+            """,
+            "followup": f"""
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <h2 style="color: #6366f1;">Following Up</h2>
+                    <p>Hi {lead.get('owner_name')},</p>
+                    <p>I wanted to follow up on my previous message about helping {lead.get('business_name')} grow.</p>
+                    <p>Quick question: What's your biggest challenge right now in growing your roofing business?</p>
+                    <p>Happy to share some insights that might help.</p>
+                    <br>
+                    <p>Best,<br>Your Name</p>
+                </body>
+                </html>
+            """
+        }
+        
+        return templates.get(template_type, templates["intro"])
+    
+    def get_subject(self, template_type: str, lead: dict) -> str:
+        """Get email subject line"""
+        subjects = {
+            "intro": f"Quick question about {lead.get('business_name')}",
+            "partnership": f"Partnership opportunity in {lead.get('city')}",
+            "demo": "Free demo - 40% efficiency boost for your roofing business",
+            "followup": "Following up on our conversation"
+        }
+        return subjects.get(template_type, "Reaching out")
+
+
+def measure(label: str, render, recipients, template: str):
+    started = time.perf_counter()
+    for recipient in recipients:
+        render(template, recipient)
+    elapsed = time.perf_counter() - started
+    print(f"{label:>10} {template:>12}: {len(recipients) / elapsed:12.0f} renders/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipients", type=int, default=100000)
+    args = parser.parse_args()
+
+    recipients = sample_recipients(args.recipients)
+    legacy = LegacyTemplates()
+
+    def legacy_render(template, lead):
+        legacy.get_subject(template, lead)
+        return legacy.get_template(template, lead)
+
+    def compiled_render(template, lead):
+        registry.render_subject(template, lead)
+        return registry.render_body(template, lead)
+
+    for template in ("intro", "partnership", "demo", "followup"):
+        assert legacy_render(template, recipients[0]) == compiled_render(template, recipients[0])
+        before = measure("legacy", legacy_render, recipients, template)
+        after = measure("compiled", compiled_render, recipients, template)
+        print(f"{'speedup':>23}: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
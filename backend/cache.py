@@ -0,0 +1,104 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class ResultCache:
+    """
+    Async TTL + LRU cache with single-flight computation.
+
+    Entries expire ``ttl`` seconds after they are stored; the least
+    recently used ones are evicted once the summed ``weigh(value)`` of
+    all entries exceeds ``max_weight`` (e.g. approximate bytes). While a
+    key is being computed, concurrent callers for the same key await the
+    same in-flight result instead of starting their own.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_weight: int = 64 * 1024 * 1024,
+                 weigh: Callable[[Any], int] = lambda value: 1):
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigh = weigh
+        self.weight = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expirations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, weight, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.counters["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        weight = self.weigh(value)
+        if weight > self.max_weight:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, weight, value)
+        self.weight += weight
+        while self.weight > self.max_weight:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.counters["evictions"] += 1
+
+    def _remove(self, key: Hashable):
+        _, weight, _ = self._entries.pop(key)
+        self.weight -= weight
+
+    def clear(self):
+        self._entries.clear()
+        self.weight = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> tuple:
+        """Return ``(value, source)`` where source is 'hit', 'coalesced' or 'miss'"""
+        value = self.get(key)
+        if value is not None:
+            self.counters["hits"] += 1
+            return value, "hit"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(inflight), "coalesced"
+
+        self.counters["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an error nobody else awaited is not logged
+            future.exception()
+            raise
+        else:
+            self.put(key, value)
+            future.set_result(value)
+            return value, "miss"
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "weight": self.weight,
+            "max_weight": self.max_weight,
+            "ttl_seconds": self.ttl,
+            "inflight": len(self._inflight),
+            **self.counters
+        }
@@ -0,0 +1,294 @@
+import asyncio
+import os
+import time
+import traceback
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from dispatcher import CampaignDispatcher
+from storage import Database
+
+
+class CampaignJob:
+    """A queued campaign send and its live progress counters"""
+
+    def __init__(self, campaign: dict):
+        self.campaign = campaign
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def id(self) -> str:
+        return self.campaign["id"]
+
+    @property
+    def done(self) -> bool:
+        return self.campaign["status"] in ("done", "failed")
+
+    def record(self, result: dict):
+        if result["status"] == "sent":
+            self.campaign["emails_sent"] += 1
+        else:
+            self.campaign["emails_failed"] += 1
+
+    def progress(self) -> dict:
+        processed = self.campaign["emails_sent"] + self.campaign["emails_failed"]
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return {
+            "id": self.id,
+            "status": self.campaign["status"],
+            "total": self.campaign["recipient_count"],
+            "sent": self.campaign["emails_sent"],
+            "failed": self.campaign["emails_failed"],
+            "elapsed_seconds": round(elapsed, 3),
+            "send_rate": round(processed / elapsed, 2) if elapsed else 0.0
+        }
+
+
+class CampaignJobManager:
+    """
+    Runs campaign sends as background asyncio tasks so the API can answer
+    immediately. At most ``max_running`` campaigns send at once; the rest
+    wait in the ``queued`` state. ``on_change`` is called with the
+    campaign dict whenever its status changes, e.g. to persist it.
+
+    Recipients go through the database's durable send queue: a job claims
+    ``claim_size`` pending recipients at a time and dispatches them.
+    Outcomes are committed as they arrive, every ``record_size`` results
+    or ``record_interval`` seconds, so a restarted process can ``resume``
+    unfinished campaigns without resending what already went out, and a
+    crash leaves far fewer sends unknown.
+
+    Each campaign is held under a lease owned by this process's pid.
+    ``watch`` renews the leases every ``lease_ttl / 3`` seconds and takes
+    over campaigns whose owner stopped renewing, so when one of several
+    workers dies another one finishes its sends. ``on_adopt`` is awaited
+    before such a campaign starts, e.g. to load templates the other
+    worker registered.
+
+    ``jobs`` holds the campaigns this process is sending; a job is
+    dropped once its final state has been saved.
+    """
+
+    def __init__(self, dispatcher: CampaignDispatcher, queue: Database, max_running: int = 1,
+                 on_change: Callable[[dict], None] = None, claim_size: int = 1000,
+                 record_size: int = 100, record_interval: float = 0.25, lease_ttl: float = 30.0,
+                 on_adopt: Callable[[], Awaitable[None]] = None):
+        self.dispatcher = dispatcher
+        self.queue = queue
+        self.max_running = max_running
+        self.on_change = on_change
+        self.claim_size = claim_size
+        self.record_size = record_size
+        self.record_interval = record_interval
+        self.lease_ttl = lease_ttl
+        self.on_adopt = on_adopt
+        self.jobs: Dict[str, CampaignJob] = {}
+        self._running: Optional[asyncio.Semaphore] = None
+        self._tasks = set()
+
+    async def submit(self, campaign: dict, recipients: List[dict]) -> CampaignJob:
+        """
+        Persist ``campaign`` and its recipients, then queue it for sending;
+        ``campaign`` is updated in place. A lead listed twice is only
+        queued once.
+        """
+        campaign["status"] = "queued"
+        # Hold the lease before the campaign is visible, or another worker could adopt it
+        await asyncio.to_thread(self.queue.acquire_lease, campaign["id"], os.getpid(), self.lease_ttl)
+        # Queue every recipient first: a crash in between leaves rows no campaign points to,
+        # rather than a campaign that resume would finish with part of its queue
+        campaign["recipient_count"] = await asyncio.to_thread(
+            self.queue.enqueue_sends, campaign["id"], recipients
+        )
+        await self._changed(campaign)
+        return self._start(CampaignJob(campaign))
+
+    async def resume(self, recover: bool = True) -> List[CampaignJob]:
+        """
+        Take over campaigns left queued or running by a process that is
+        gone, i.e. whose lease expired. Sends it claimed but never
+        recorded are marked 'unknown' and counted as failed rather than
+        sent again. ``recover=True`` first does that for every campaign
+        and drops all leases, so it is only for when no other process
+        uses the database (a lone server, or before forking workers).
+        """
+        if recover:
+            await asyncio.to_thread(self.queue.recover_sends)
+        owner = os.getpid()
+        jobs = []
+        for orphan in await asyncio.to_thread(self.queue.orphaned_campaigns, self.lease_ttl):
+            campaign_id = orphan["id"]
+            if campaign_id in self.jobs:
+                continue
+            if not await asyncio.to_thread(self.queue.acquire_lease, campaign_id, owner, self.lease_ttl):
+                continue
+            # It may have finished between the lookup and taking the lease
+            campaign = await asyncio.to_thread(self.queue.get_campaign, campaign_id)
+            if campaign is None or campaign["status"] not in ("queued", "running"):
+                await asyncio.to_thread(self.queue.release_lease, campaign_id, owner)
+                continue
+            campaign.update(await asyncio.to_thread(self.queue_progress, campaign_id))
+            campaign["status"] = "queued"
+            await self._changed(campaign)
+            if self.on_adopt is not None:
+                await self.on_adopt()
+            jobs.append(self._start(CampaignJob(campaign)))
+        return jobs
+
+    def _start(self, job: CampaignJob) -> CampaignJob:
+        if self._running is None:
+            self._running = asyncio.Semaphore(self.max_running)
+        self.jobs[job.id] = job
+        task = job.task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def watch(self):
+        """
+        Renew this process's campaign leases and adopt orphaned campaigns
+        every ``lease_ttl / 3`` seconds, until cancelled. A job whose lease
+        was taken over (this process stalled past the TTL) is stopped.
+        """
+        owner = os.getpid()
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            try:
+                active = [job.id for job in list(self.jobs.values()) if not job.done]
+                held = set(await asyncio.to_thread(self.queue.renew_leases, owner, active))
+                for campaign_id in active:
+                    job = self.jobs.get(campaign_id)
+                    if campaign_id not in held and job is not None and not job.done:
+                        del self.jobs[campaign_id]
+                        job.task.cancel()
+                await self.resume(recover=False)
+            except Exception:
+                traceback.print_exc()
+
+    async def _changed(self, campaign: dict):
+        # on_change usually writes to the database; keep it off the event loop
+        if self.on_change is not None:
+            await asyncio.to_thread(self.on_change, dict(campaign))
+
+    async def _record(self, job: CampaignJob, outcomes: list, ready: asyncio.Event,
+                      finished: asyncio.Event):
+        """Commit buffered ``(seq, result)`` outcomes until ``finished`` is set"""
+        while True:
+            if not finished.is_set():
+                try:
+                    await asyncio.wait_for(ready.wait(), self.record_interval)
+                except asyncio.TimeoutError:
+                    pass
+            ready.clear()
+            if outcomes:
+                batch = outcomes[:]
+                del outcomes[:]
+                await asyncio.to_thread(self.queue.record_sends, job.id, batch)
+            if finished.is_set() and not outcomes:
+                return
+
+    async def _run(self, job: CampaignJob):
+        async with self._running:
+            job.campaign["status"] = "running"
+            job.started_at = time.monotonic()
+            await self._changed(job.campaign)
+            outcomes = []
+            ready, finished = asyncio.Event(), asyncio.Event()
+            recorder = asyncio.create_task(self._record(job, outcomes, ready, finished))
+            try:
+                try:
+                    while True:
+                        claimed = await asyncio.to_thread(self.queue.claim_sends, job.id, self.claim_size)
+                        if not claimed:
+                            break
+
+                        def on_result(index: int, result: dict, claimed=claimed):
+                            job.record(result)
+                            outcomes.append((claimed[index][0], result))
+                            if len(outcomes) >= self.record_size:
+                                ready.set()
+
+                        await self.dispatcher.dispatch(
+                            [recipient for _, recipient in claimed],
+                            job.campaign["template"],
+                            on_result=on_result,
+                            collect_details=False
+                        )
+                finally:
+                    # Commit whatever arrived, even if the dispatch failed
+                    finished.set()
+                    ready.set()
+                    await recorder
+                job.campaign["status"] = "done"
+            except asyncio.CancelledError:
+                # Shutting down, or the lease was lost: whoever holds the
+                # campaign next finishes it, so its stored state is left alone
+                job.finished_at = time.monotonic()
+                raise
+            except Exception as e:
+                # Claimed sends whose outcome never came back may or may not have gone out
+                await asyncio.to_thread(self.queue.abandon_sends, job.id)
+                job.campaign.update(await asyncio.to_thread(self.queue_progress, job.id))
+                job.campaign["status"] = "failed"
+                job.campaign["error"] = str(e)
+            job.finished_at = time.monotonic()
+            job.campaign["completed_at"] = datetime.now().isoformat()
+            await self._changed(job.campaign)
+            await asyncio.to_thread(self.queue.release_lease, job.id, os.getpid())
+            # Its final state is stored; stream_stored serves it from here on
+            if self.jobs.get(job.id) is job:
+                del self.jobs[job.id]
+
+    def queue_progress(self, campaign_id: str) -> dict:
+        """Sent and failed counters of a campaign, from its send queue"""
+        counts = self.queue.send_queue_counts(campaign_id)
+        return {"emails_sent": counts["sent"], "emails_failed": counts["failed"] + counts["unknown"]}
+
+    def queue_depth(self) -> dict:
+        """Send queue rows by state, summed over campaigns that are not finished"""
+        depth = {}
+        for job in list(self.jobs.values()):
+            if job.done:
+                continue
+            for state, count in self.queue.send_queue_counts(job.id).items():
+                depth[(state,)] = depth.get((state,), 0) + count
+        return depth
+
+    async def stream(self, job: CampaignJob, interval: float = 0.5) -> AsyncIterator[dict]:
+        """
+        Yield a progress snapshot every ``interval`` seconds until the job
+        ends. A job stopped before finishing (lost lease, shutdown) is
+        followed in the database, where whoever takes it over reports.
+        """
+        while True:
+            yield job.progress()
+            if job.done:
+                return
+            if job.task is not None and job.task.done():
+                async for progress in self.stream_stored(job.id, interval):
+                    yield progress
+                return
+            await asyncio.sleep(interval)
+
+    async def stream_stored(self, campaign_id: str, interval: float = 0.5) -> AsyncIterator[dict]:
+        """
+        Like ``stream`` for a campaign this process is not sending (another
+        worker is, or it already finished): progress is read from the
+        database instead of live counters.
+        """
+        while True:
+            campaign = await asyncio.to_thread(self.queue.get_campaign, campaign_id)
+            if campaign is None:
+                return
+            if campaign["status"] == "running":
+                campaign.update(await asyncio.to_thread(self.queue_progress, campaign_id))
+            job = CampaignJob(campaign)
+            yield job.progress()
+            if job.done:
+                return
+            await asyncio.sleep(interval)
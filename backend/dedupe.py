@@ -0,0 +1,325 @@
+import random
+import re
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from lead_store import normalize_key
+from storage import Database
+
+# Legal-form, filler and trade tokens that do not distinguish one business
+# from another; left in, they make unrelated roofers look alike
+NAME_STOPWORDS = {
+    "llc", "inc", "co", "corp", "corporation", "company", "ltd", "group",
+    "the", "and", "of", "services", "service", "solutions", "pros",
+    "roof", "roofing", "roofers", "contractor", "contractors", "exteriors", "gutter"
+}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """'+1 (214) 555-0100', '214.555.0100' -> '+1-214-555-0100'"""
+    digits = "".join(ch for ch in phone or "" if ch.isdigit())
+    if len(digits) == 10:
+        digits = "1" + digits
+    if len(digits) == 11 and digits[0] == "1":
+        return f"+1-{digits[1:4]}-{digits[4:7]}-{digits[7:]}"
+    return f"+{digits}" if digits else ""
+
+
+def normalize_email(email: Optional[str]) -> str:
+    return (email or "").strip().lower()
+
+
+def normalize_website(website: Optional[str]) -> Optional[str]:
+    """'https://www.Example.com/' -> 'example.com'"""
+    if not website:
+        return website
+    site = website.strip().lower()
+    site = re.sub(r"^[a-z]+://", "", site)
+    if site.startswith("www."):
+        site = site[4:]
+    return site.rstrip("/")
+
+
+def normalize_name(name: Optional[str], city: Optional[str] = None) -> str:
+    """Lowercase alphanumeric tokens without legal suffixes or the city name"""
+    tokens = _NON_ALNUM.sub(" ", (name or "").lower()).split()
+    city_tokens = set(_NON_ALNUM.sub(" ", (city or "").lower()).split())
+    return " ".join(t for t in tokens if t not in NAME_STOPWORDS and t not in city_tokens)
+
+
+def normalize_lead(lead):
+    """Copy of a pydantic ``Lead`` with canonical phone, email and website"""
+    return lead.model_copy(update={
+        "phone": normalize_phone(lead.phone),
+        "email": normalize_email(lead.email),
+        "website": normalize_website(lead.website)
+    })
+
+
+class MinHasher:
+    """
+    MinHash signatures over character 3-gram shingles. Each permutation
+    is a random 32-bit XOR mask over the shingle's CRC32, which lets
+    ``min(map(mask.__xor__, hashes))`` run the inner loop in C.
+    """
+
+    def __init__(self, num_perm: int = 24, shingle_size: int = 3, seed: int = 1):
+        self.shingle_size = shingle_size
+        self._masks = [random.Random(seed + i).getrandbits(32) for i in range(num_perm)]
+
+    def shingles(self, text: str) -> set:
+        text = f" {text} "
+        size = self.shingle_size
+        return {zlib.crc32(text[i:i + size].encode()) for i in range(max(1, len(text) - size + 1))}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashes = self.shingles(text)
+        return tuple(min(map(mask.__xor__, hashes)) for mask in self._masks)
+
+
+class NameIndex:
+    """
+    MinHash signatures of one city's business names for LSH lookups.
+
+    Signatures live in one growable ``uint32`` array and each band is
+    folded into a ``uint64`` hash, so a lead costs about 200 bytes
+    instead of Python tuples and bucket lists. The band hashes carry
+    their band number in the top bits, so all bands can be kept in one
+    sorted array with their row positions, and a lookup binary-searches
+    it; rows added since the last merge (at most ``MERGE_EVERY``) are
+    compared directly.
+    Full-signature agreement is then checked on just the colliding rows.
+    """
+
+    MERGE_EVERY = 1024
+
+    def __init__(self, num_perm: int, bands: int):
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ids: List[str] = []
+        self._signatures = np.empty((16, num_perm), dtype=np.uint32)
+        # One row per band, so the unmerged tail is contiguous memory
+        self._band_hashes = np.empty((bands, 16), dtype=np.uint64)
+        self._sorted = np.empty(0, dtype=np.uint64)
+        self._positions = np.empty(0, dtype=np.int32)
+        self._merged = 0
+        self._tags = np.arange(bands, dtype=np.uint64) << np.uint64(61)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def band_hashes(self, signatures: np.ndarray) -> np.ndarray:
+        """Band hashes of one signature, or of each row of a 2-D array of them"""
+        bands = signatures.reshape(*signatures.shape[:-1], self.bands, self.rows).astype(np.uint64)
+        folded = np.zeros(bands.shape[:-1], dtype=np.uint64)
+        for row in range(self.rows):
+            folded = folded * np.uint64(0x100000001B3) + bands[..., row]
+        # The band number goes in the top 3 bits
+        return (folded >> np.uint64(3)) | self._tags
+
+    def _reserve(self, count: int):
+        capacity = len(self._signatures)
+        if len(self.ids) + count > capacity:
+            capacity = max(2 * capacity, len(self.ids) + count)
+            signatures = np.empty((capacity, self._signatures.shape[1]), dtype=np.uint32)
+            signatures[:len(self.ids)] = self._signatures[:len(self.ids)]
+            band_hashes = np.empty((self.bands, capacity), dtype=np.uint64)
+            band_hashes[:, :len(self.ids)] = self._band_hashes[:, :len(self.ids)]
+            self._signatures, self._band_hashes = signatures, band_hashes
+
+    def add(self, lead_id: str, signature: np.ndarray, band_hashes: np.ndarray):
+        self._reserve(1)
+        size = len(self.ids)
+        self._signatures[size] = signature
+        self._band_hashes[:, size] = band_hashes
+        self.ids.append(lead_id)
+        if len(self.ids) - self._merged >= self.MERGE_EVERY:
+            self._merge()
+
+    def add_many(self, lead_ids: List[str], signatures: np.ndarray):
+        self._reserve(len(lead_ids))
+        size = len(self.ids)
+        self._signatures[size:size + len(lead_ids)] = signatures
+        self._band_hashes[:, size:size + len(lead_ids)] = self.band_hashes(signatures).T
+        self.ids.extend(lead_ids)
+        if len(self.ids) - self._merged >= self.MERGE_EVERY:
+            self._merge()
+
+    def _merge(self):
+        """Move the unmerged rows' band hashes into the sorted lookup array"""
+        size = len(self.ids)
+        hashes = self._band_hashes[:, self._merged:size].ravel()
+        positions = np.tile(np.arange(self._merged, size, dtype=np.int32), self.bands)
+        order = np.argsort(hashes, kind="stable")
+        at = np.searchsorted(self._sorted, hashes[order], side="right")
+        self._sorted = np.insert(self._sorted, at, hashes[order])
+        self._positions = np.insert(self._positions, at, positions[order])
+        self._merged = size
+
+    def match(self, signature: np.ndarray, band_hashes: np.ndarray, threshold: float) -> Optional[str]:
+        """ID of the first indexed name whose signature agrees on ``threshold`` of its values"""
+        size = len(self.ids)
+        if not size:
+            return None
+        # Band numbers stay below 7, so hash + 1 cannot overflow
+        bounds = np.searchsorted(self._sorted, np.concatenate((band_hashes, band_hashes + np.uint64(1))))
+        starts, ends = bounds[:self.bands], bounds[self.bands:]
+        found = [self._positions[start:end] for start, end in zip(starts[ends > starts], ends[ends > starts])]
+        tail = self._band_hashes[:, self._merged:size]
+        found.append(self._merged + np.flatnonzero((tail == band_hashes[:, None]).any(axis=0)))
+        candidates = np.concatenate(found)
+        if not len(candidates):
+            return None
+        agreement = (self._signatures[candidates] == signature).mean(axis=1)
+        hits = candidates[agreement >= threshold]
+        return self.ids[hits.min()] if len(hits) else None
+
+
+class LeadDeduplicator:
+    """
+    Streaming normalize-and-dedupe stage for lead ingest.
+
+    A lead is a duplicate of one already seen when it shares the
+    canonical phone number, the email within the same city, or the
+    website within the same city (exact lookups), or when its business
+    name is a near match in the same city. Near matches use MinHash
+    signatures with LSH banding (``NameIndex``), so only leads that
+    collide in a band are compared in full. A lead matching only itself
+    (same ID) is an update and passes through.
+
+    With ``stored`` (the lead database), stored leads count as seen
+    without being loaded up front: exact keys are looked up in the
+    database's indexes, and a city's names are indexed the first time a
+    lead from that city is checked.
+    """
+
+    def __init__(self, num_perm: int = 24, bands: int = 6, threshold: float = 0.8,
+                 stored: Optional[Database] = None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        if bands > 7:
+            # NameIndex keeps the band number in 3 bits of each band hash
+            raise ValueError("at most 7 bands are supported")
+        self.hasher = MinHasher(num_perm)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.stored = stored
+
+        self._phones: Dict[str, str] = {}
+        self._emails: Dict[tuple, str] = {}
+        self._websites: Dict[tuple, str] = {}
+        self._names: Dict[str, NameIndex] = {}
+        self.counters = {"seen": 0, "unique": 0, "phone": 0, "email": 0, "website": 0, "name": 0}
+
+    def _exact_keys(self, lead):
+        city = normalize_key(lead.city)
+        phone = normalize_phone(lead.phone)
+        email = normalize_email(lead.email)
+        website = normalize_website(lead.website)
+        return (
+            phone or None,
+            (email, city) if email else None,
+            (website, city) if website else None
+        )
+
+    def _city_names(self, lead) -> NameIndex:
+        city = normalize_key(lead.city)
+        names = self._names.get(city)
+        if names is None:
+            names = self._names[city] = NameIndex(self.num_perm, self.bands)
+            if self.stored is not None:
+                rows = self.stored.city_names(lead.city)
+                signatures = np.array([
+                    self.hasher.signature(normalize_name(business_name, lead.city)) for _, business_name in rows
+                ], dtype=np.uint32).reshape(len(rows), self.num_perm)
+                names.add_many([lead_id for lead_id, _ in rows], signatures)
+        return names
+
+    def _signature(self, business_name: str, city: str, names: NameIndex) -> tuple:
+        signature = np.array(self.hasher.signature(normalize_name(business_name, city)), dtype=np.uint32)
+        return signature, names.band_hashes(signature)
+
+    def _index_name(self, names: NameIndex, lead_id: str, business_name: str, city: str):
+        """Add a name unless it is already indexed (under any ID)"""
+        signature, band_hashes = self._signature(business_name, city, names)
+        if names.match(signature, band_hashes, self.threshold) is None:
+            names.add(lead_id, signature, band_hashes)
+
+    def check(self, lead, count: bool = True) -> Optional[str]:
+        """
+        Reason ('phone', 'email', 'website' or 'name') if ``lead``
+        duplicates a different lead already seen; otherwise record it and
+        return None. ``count=False`` records without touching the counters.
+        """
+        phone, email, website = self._exact_keys(lead)
+        reason = None
+        for name, key, index in (("phone", phone, self._phones),
+                                 ("email", email, self._emails),
+                                 ("website", website, self._websites)):
+            if key and index.get(key, lead.id) != lead.id:
+                reason = name
+                break
+        if reason is None and self.stored is not None:
+            reason = self.stored.duplicate_key(
+                lead.id, phone, email and email[0], website and website[0], lead.city
+            )
+
+        names = signature = None
+        if reason is None:
+            names = self._city_names(lead)
+            signature, band_hashes = self._signature(lead.business_name, lead.city, names)
+            match = names.match(signature, band_hashes, self.threshold)
+            if match is not None and match != lead.id:
+                reason = "name"
+            elif match == lead.id:
+                names = None
+
+        if count:
+            self.counters["seen"] += 1
+            self.counters[reason or "unique"] += 1
+        if reason is not None:
+            return reason
+
+        if phone:
+            self._phones.setdefault(phone, lead.id)
+        if email:
+            self._emails.setdefault(email, lead.id)
+        if website:
+            self._websites.setdefault(website, lead.id)
+        if names is not None:
+            names.add(lead.id, signature, band_hashes)
+        return None
+
+    def process(self, leads: Iterable) -> Iterator:
+        """
+        Yield normalized copies of the leads that are not duplicates.
+
+        With ``stored``, the leads of earlier calls must have been
+        written by the time of the next one: their exact keys are then
+        found in the database, so the in-memory ones are dropped.
+        """
+        if self.stored is not None:
+            self._phones.clear()
+            self._emails.clear()
+            self._websites.clear()
+        for lead in leads:
+            if self.check(lead) is None:
+                yield normalize_lead(lead)
+
+    def add_stored(self, leads: Iterable):
+        """
+        Index the names of leads another process stored, in the cities
+        already loaded; other cities pick them up when they are loaded.
+        """
+        for lead in leads:
+            names = self._names.get(normalize_key(lead.city))
+            if names is not None:
+                self._index_name(names, lead.id, lead.business_name, lead.city)
+
+    def stats(self) -> dict:
+        return dict(self.counters, duplicates=self.counters["seen"] - self.counters["unique"])
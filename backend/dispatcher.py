@@ -0,0 +1,212 @@
+import asyncio
+import os
+import random
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from email_service import EmailService
+from metrics import registry
+from mime import MessageBuilder
+
+DISPATCH_QUEUE_DEPTH = registry.gauge(
+    "dispatch_queue_depth",
+    "Envelopes waiting for a dispatcher worker, across all running dispatches"
+)
+
+
+class TokenBucket:
+    """
+    Async token bucket: ``rate`` tokens per second with bursts of up to
+    ``burst`` tokens. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    @property
+    def idle(self) -> bool:
+        """True once the bucket has refilled, so dropping it changes nothing"""
+        if self.rate <= 0:
+            return True
+        return self.tokens + (time.monotonic() - self.updated) * self.rate >= self.capacity and not self._lock.locked()
+
+
+class CampaignDispatcher:
+    """
+    Sends a campaign with a fixed number of asyncio workers, each handing
+    ``EmailService.send_message`` to a thread so the event loop stays free.
+    Messages are pre-encoded bytes from the campaign's ``MessageBuilder``.
+    Sends are throttled by a global and a per-recipient-domain token
+    bucket, and transient (4xx) SMTP replies are retried with backoff.
+
+    Per-domain buckets exist only when ``per_domain_rate`` is set; they
+    are kept in LRU order and refilled (idle) ones are dropped, with at
+    most ``max_domains`` held at once.
+
+    When the template does not depend on the lead at all, recipients are
+    grouped into multi-RCPT envelopes of up to ``batch_size`` addresses,
+    one SMTP transaction each; results are still per recipient, taken
+    from the server's RCPT replies.
+    """
+
+    def __init__(self, email_service: EmailService, concurrency: int = None,
+                 global_rate: float = None, per_domain_rate: float = None,
+                 max_retries: int = None, backoff_base: float = 0.5,
+                 batch_size: int = None, max_domains: int = 10000):
+        self.email_service = email_service
+        self.concurrency = concurrency or int(os.getenv("DISPATCH_CONCURRENCY", str(email_service.pool.max_size)))
+        self.global_rate = global_rate if global_rate is not None else float(os.getenv("DISPATCH_GLOBAL_RATE", "0"))
+        self.per_domain_rate = per_domain_rate if per_domain_rate is not None else float(os.getenv("DISPATCH_DOMAIN_RATE", "0"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("DISPATCH_MAX_RETRIES", "3"))
+        self.backoff_base = backoff_base
+        self.batch_size = batch_size or int(os.getenv("DISPATCH_BATCH_SIZE", "50"))
+
+        self.max_domains = max_domains
+
+        self._global_bucket = TokenBucket(self.global_rate)
+        self._unlimited = TokenBucket(0)
+        self._domain_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def _domain_bucket(self, email: str) -> TokenBucket:
+        if self.per_domain_rate <= 0:
+            return self._unlimited
+        domain = email.rsplit("@", 1)[-1].lower()
+        buckets = self._domain_buckets
+        bucket = buckets.get(domain)
+        if bucket is not None:
+            buckets.move_to_end(domain)
+            return bucket
+        # Least recently used first: drop the ones that have refilled, then
+        # anything beyond the cap
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if not oldest.idle and len(buckets) < self.max_domains:
+                break
+            buckets.popitem(last=False)
+        bucket = buckets[domain] = TokenBucket(self.per_domain_rate)
+        return bucket
+
+    async def _send(self, recipient: dict, builder: MessageBuilder) -> dict:
+        to_email = recipient.get("email")
+        subject, message = builder.build(to_email, recipient)
+        domain_bucket = self._domain_bucket(to_email or "")
+
+        attempt = 0
+        while True:
+            await self._global_bucket.acquire()
+            await domain_bucket.acquire()
+            result = await asyncio.to_thread(self.email_service.send_message, to_email, subject, message)
+            code = result.get("code")
+            if result["status"] == "sent" or not code or not 400 <= code < 500 or attempt >= self.max_retries:
+                result["attempts"] = attempt + 1
+                return result
+            delay = self.backoff_base * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            attempt += 1
+
+    async def _send_batch(self, recipients: List[dict], builder: MessageBuilder) -> List[dict]:
+        """Send a static message to several recipients; retries only the 4xx ones"""
+        subject, message = builder.build_shared()
+        results: List[Optional[dict]] = [None] * len(recipients)
+        pending = list(range(len(recipients)))
+
+        attempt = 0
+        while True:
+            emails = [recipients[i].get("email") for i in pending]
+            for email in emails:
+                await self._global_bucket.acquire()
+                await self._domain_bucket(email or "").acquire()
+            batch_results = await asyncio.to_thread(self.email_service.send_batch, emails, subject, message)
+
+            retry = []
+            for i, result in zip(pending, batch_results):
+                code = result.get("code")
+                if result["status"] == "sent" or not code or not 400 <= code < 500 or attempt >= self.max_retries:
+                    result["attempts"] = attempt + 1
+                    results[i] = result
+                else:
+                    retry.append(i)
+            if not retry:
+                return results
+            delay = self.backoff_base * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            pending = retry
+            attempt += 1
+
+    async def dispatch(self, recipients: List[dict], template: str,
+                       on_result: Callable[[int, dict], None] = None,
+                       collect_details: bool = True) -> dict:
+        """
+        Send a campaign; returns the same summary shape as ``send_campaign``.
+        Large background sends pass ``collect_details=False`` and observe
+        results through ``on_result(index, result)`` instead of keeping
+        them all in memory; it is called as each result arrives, with the
+        recipient's position in ``recipients``.
+        """
+        results = {
+            "total": len(recipients),
+            "sent": 0,
+            "failed": 0,
+            "details": [None] * len(recipients) if collect_details else []
+        }
+        # Headers and template skeleton are encoded once for the whole campaign
+        builder = self.email_service.message_builder(template)
+        batched = builder.is_static and self.batch_size > 1
+        size = self.batch_size if batched else 1
+        work = asyncio.Queue()
+        for start in range(0, len(recipients), size):
+            work.put_nowait((start, recipients[start:start + size]))
+        DISPATCH_QUEUE_DEPTH.inc(amount=work.qsize())
+
+        async def worker():
+            while True:
+                try:
+                    start, chunk = work.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                DISPATCH_QUEUE_DEPTH.dec()
+                if batched:
+                    chunk_results = await self._send_batch(chunk, builder)
+                else:
+                    chunk_results = [await self._send(chunk[0], builder)]
+                for index, result in enumerate(chunk_results, start):
+                    if result["status"] == "sent":
+                        results["sent"] += 1
+                    else:
+                        results["failed"] += 1
+                    if collect_details:
+                        results["details"][index] = result
+                    if on_result is not None:
+                        on_result(index, result)
+
+        workers = min(self.concurrency, work.qsize())
+        try:
+            # A failing worker cancels its siblings, so nothing keeps sending
+            # (or reporting results) for a dispatch that has already failed
+            async with asyncio.TaskGroup() as tasks:
+                for _ in range(workers):
+                    tasks.create_task(worker())
+        except ExceptionGroup as group:
+            raise group.exceptions[0]
+        finally:
+            # Envelopes abandoned by a failed dispatch are no longer waiting
+            DISPATCH_QUEUE_DEPTH.dec(amount=work.qsize())
+        return results
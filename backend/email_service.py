@@ -1,10 +1,262 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List
+from typing import List, Optional
 import os
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+import templates
+from metrics import registry
+from mime import MessageBuilder
+
+SMTP_PHASE_DURATION = registry.histogram(
+    "smtp_phase_duration_seconds",
+    "SMTP time by phase: connect (TCP, greeting, EHLO), tls, auth, data (one successful MAIL/RCPT/DATA transaction)",
+    ("phase",)
+)
+
+
+def smtp_error_code(error: Exception) -> Optional[int]:
+    """SMTP reply code carried by an smtplib exception, if any"""
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code
+    if isinstance(error, smtplib.SMTPRecipientsRefused) and error.recipients:
+        return next(iter(error.recipients.values()))[0]
+    return None
+
+
+def pipelined_sendmail(server: smtplib.SMTP, from_addr: str, to_addrs: List[str], msg: bytes) -> dict:
+    """
+    ``sendmail`` for servers that advertise PIPELINING (RFC 2920): MAIL,
+    every RCPT and DATA go out in one write and their replies are read
+    back together, so an envelope costs one round trip before the
+    message no matter how many recipients it has. Returns the refused
+    recipients and raises like ``sendmail``.
+    """
+    commands = [f"MAIL FROM:{smtplib.quoteaddr(from_addr)}"]
+    commands += [f"RCPT TO:{smtplib.quoteaddr(addr)}" for addr in to_addrs]
+    commands.append("DATA")
+    server.send("".join(command + "\r\n" for command in commands))
+
+    mail_code, mail_reply = server.getreply()
+    refused = {}
+    for addr in to_addrs:
+        code, reply = server.getreply()
+        if code not in (250, 251):
+            refused[addr] = (code, reply)
+    data_code, data_reply = server.getreply()
+
+    if mail_code != 250 or len(refused) == len(to_addrs) or data_code != 354:
+        if data_code == 354:
+            # The server took DATA anyway; end it with an empty message
+            server.send(b".\r\n")
+            server.getreply()
+        try:
+            server.rset()
+        except smtplib.SMTPServerDisconnected:
+            pass
+        if mail_code != 250:
+            raise smtplib.SMTPSenderRefused(mail_code, mail_reply, from_addr)
+        if len(refused) == len(to_addrs):
+            raise smtplib.SMTPRecipientsRefused(refused)
+        raise smtplib.SMTPDataError(data_code, data_reply)
+
+    data = re.sub(br"(?m)^\.", b"..", msg)
+    if not data.endswith(b"\r\n"):
+        data += b"\r\n"
+    server.send(data + b".\r\n")
+    code, reply = server.getreply()
+    if code != 250:
+        try:
+            server.rset()
+        except smtplib.SMTPServerDisconnected:
+            pass
+        raise smtplib.SMTPDataError(code, reply)
+    return refused
+
+
+class PooledConnection:
+    """An authenticated SMTP session plus its usage counters"""
+
+    def __init__(self, conn_id: int, server: smtplib.SMTP):
+        self.id = conn_id
+        self.server = server
+        self.created_at = time.monotonic()
+        self.messages = 0
+        self.busy_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "id": self.id,
+            "messages": self.messages,
+            "age_seconds": round(time.monotonic() - self.created_at, 3),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "messages_per_sec": round(self.messages / self.busy_seconds, 2) if self.busy_seconds else 0.0
+        }
+
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of SMTP sessions that stay connected (and logged in)
+    across messages, so a campaign pays the TCP/TLS/AUTH cost once per
+    connection instead of once per recipient.
+    """
+
+    def __init__(self, host: str, port: int, user: str = "", password: str = "",
+                 max_size: int = 4, max_messages_per_connection: int = 100,
+                 timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.max_size = max_size
+        self.max_messages_per_connection = max_messages_per_connection
+        self.timeout = timeout
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._active = {}
+        self._totals = {
+            "connections_opened": 0,
+            "connections_recycled": 0,
+            "reconnects": 0,
+            "messages": 0
+        }
+
+    def _open(self) -> PooledConnection:
+        started = time.perf_counter()
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo_or_helo_if_needed()
+            connected = time.perf_counter()
+            SMTP_PHASE_DURATION.observe(connected - started, "connect")
+            # For production SMTP (SendGrid, Mailgun)
+            if self.user and self.password:
+                server.starttls()
+                secured = time.perf_counter()
+                SMTP_PHASE_DURATION.observe(secured - connected, "tls")
+                server.login(self.user, self.password)
+                SMTP_PHASE_DURATION.observe(time.perf_counter() - secured, "auth")
+        except Exception:
+            server.close()
+            raise
+
+        with self._lock:
+            conn = PooledConnection(self._next_id, server)
+            self._next_id += 1
+            self._active[conn.id] = conn
+            self._totals["connections_opened"] += 1
+        return conn
+
+    def _discard(self, conn: PooledConnection, graceful: bool = True):
+        with self._lock:
+            self._active.pop(conn.id, None)
+        try:
+            if graceful:
+                conn.server.quit()
+            else:
+                conn.server.close()
+        except Exception:
+            conn.server.close()
+
+    @contextmanager
+    def connection(self, fresh: bool = False):
+        """
+        Check out a connection, blocking while the pool is exhausted;
+        ``fresh`` skips the idle sessions and always opens a new one
+        """
+        self._slots.acquire()
+        conn = None
+        try:
+            try:
+                if fresh:
+                    raise queue.Empty
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            yield conn
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # The server answered and smtplib has RSET the session; reuse it
+            raise
+        except Exception:
+            if conn is not None:
+                self._discard(conn, graceful=False)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                if conn.messages >= self.max_messages_per_connection:
+                    with self._lock:
+                        self._totals["connections_recycled"] += 1
+                    self._discard(conn)
+                else:
+                    self._idle.put(conn)
+            self._slots.release()
+
+    def send(self, from_addr: str, to_addrs, msg) -> dict:
+        """
+        Send a message (``email.message.Message`` or raw bytes) on a pooled
+        connection and return the refused recipients. Bytes are pipelined
+        when the server supports it. If the server has dropped the
+        session (typically an idle timeout), every idle session is just
+        as old, so they are all closed and the message is retried once on
+        a newly opened connection.
+        """
+        for attempt in range(2):
+            try:
+                with self.connection(fresh=attempt > 0) as conn:
+                    started = time.monotonic()
+                    server = conn.server
+                    server.ehlo_or_helo_if_needed()
+                    if isinstance(msg, bytes) and server.has_extn("pipelining"):
+                        refused = pipelined_sendmail(server, from_addr, to_addrs, msg)
+                    elif isinstance(msg, (bytes, str)):
+                        refused = server.sendmail(from_addr, to_addrs, msg)
+                    else:
+                        refused = server.send_message(msg, from_addr, to_addrs)
+                    elapsed = time.monotonic() - started
+                    SMTP_PHASE_DURATION.observe(elapsed, "data")
+                    conn.busy_seconds += elapsed
+                    conn.messages += 1
+                    with self._lock:
+                        self._totals["messages"] += 1
+                    return refused
+            except smtplib.SMTPServerDisconnected:
+                if attempt:
+                    raise
+                with self._lock:
+                    self._totals["reconnects"] += 1
+                self.close(graceful=False)
+
+    def close(self, graceful: bool = True):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn, graceful)
+
+    def stats(self) -> dict:
+        with self._lock:
+            connections = [conn.snapshot() for conn in self._active.values()]
+            totals = dict(self._totals)
+        return {
+            "max_size": self.max_size,
+            "max_messages_per_connection": self.max_messages_per_connection,
+            "open_connections": len(connections),
+            "idle_connections": self._idle.qsize(),
+            **totals,
+            "connections": connections
+        }
+
 class EmailService:
     """
     Email service that works with local SMTP (MailHog) for testing
@@ -17,6 +269,15 @@ class EmailService:
         self.smtp_user = os.getenv("SMTP_USER", "")
         self.smtp_pass = os.getenv("SMTP_PASS", "")
         self.from_email = os.getenv("FROM_EMAIL", "demo@leadscaper.local")
+        self.templates = templates.registry
+        self.pool = SMTPConnectionPool(
+            self.smtp_host,
+            self.smtp_port,
+            self.smtp_user,
+            self.smtp_pass,
+            max_size=int(os.getenv("SMTP_POOL_SIZE", "4")),
+            max_messages_per_connection=int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+        )
         
     def send_email(self, to_email: str, subject: str, html_body: str) -> dict:
         """Send a single email"""
@@ -30,15 +291,15 @@ class EmailService:
             # Attach HTML body
             html_part = MIMEText(html_body, 'html')
             msg.attach(html_part)
-            
-            # Connect to SMTP server
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                # For production SMTP (SendGrid, Mailgun)
-                if self.smtp_user and self.smtp_pass:
-                    server.starttls()
-                    server.login(self.smtp_user, self.smtp_pass)
-                
-                server.send_message(msg)
+        except Exception as e:
+            return self._failed(to_email, e)
+        return self.send_message(to_email, subject, msg)
+    
+    def send_message(self, to_email: str, subject: str, message) -> dict:
+        """Send an already built message (``MessageBuilder`` bytes or a ``Message``)"""
+        try:
+            # Reuse a pooled, already-authenticated SMTP session
+            self.pool.send(self.from_email, [to_email], message)
             
             return {
                 "status": "sent",
@@ -48,12 +309,58 @@ class EmailService:
             }
             
         except Exception as e:
-            return {
-                "status": "failed",
-                "to": to_email,
-                "error": str(e),
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._failed(to_email, e)
+    
+    def send_batch(self, to_emails: List[str], subject: str, message: bytes) -> List[dict]:
+        """
+        Send one message to several recipients in a single SMTP envelope.
+        Returns one result per address, in order; recipients the server
+        refused at RCPT time fail with their own reply code.
+        """
+        timestamp = datetime.now().isoformat()
+        valid = [email for email in to_emails if email]
+        try:
+            refused = self.pool.send(self.from_email, valid, message) if valid else {}
+            error = None
+        except smtplib.SMTPRecipientsRefused as e:
+            refused, error = e.recipients, None
+        except Exception as e:
+            refused, error = {}, e
+
+        results = []
+        for to_email in to_emails:
+            if not to_email:
+                results.append(self._failed(to_email, ValueError("missing recipient address")))
+            elif error is not None:
+                results.append(self._failed(to_email, error))
+            elif to_email in refused:
+                code, reply = refused[to_email]
+                results.append(self._failed(to_email, smtplib.SMTPRecipientsRefused({to_email: (code, reply)})))
+            else:
+                results.append({
+                    "status": "sent",
+                    "to": to_email,
+                    "subject": subject,
+                    "timestamp": timestamp
+                })
+        return results
+    
+    def _failed(self, to_email: str, error: Exception) -> dict:
+        return {
+            "status": "failed",
+            "to": to_email,
+            "error": str(error),
+            "code": smtp_error_code(error),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def message_builder(self, template_type: str) -> MessageBuilder:
+        """Pre-encoded message builder for one campaign's template"""
+        return MessageBuilder(
+            self.from_email,
+            self.templates.subject(template_type),
+            self.templates.body(template_type)
+        )
     
     def send_campaign(self, recipients: List[dict], template: str) -> dict:
         """Send emails to multiple recipients"""
@@ -63,18 +370,14 @@ class EmailService:
             "failed": 0,
             "details": []
         }
+        builder = self.message_builder(template)
         
         for recipient in recipients:
-            # Get email template
-            html_body = self.get_template(template, recipient)
-            subject = self.get_subject(template, recipient)
+            to_email = recipient.get("email")
             
-            # Send email
-            result = self.send_email(
-                to_email=recipient.get("email"),
-                subject=subject,
-                html_body=html_body
-            )
+            # Render and encode the email, then send it
+            subject, message = builder.build(to_email, recipient)
+            result = self.send_message(to_email, subject, message)
             
             if result["status"] == "sent":
                 results["sent"] += 1
@@ -87,82 +390,23 @@ class EmailService:
     
     def get_template(self, template_type: str, lead: dict) -> str:
         """Get HTML email template"""
-        templates = {
-            "intro": f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <h2 style="color: #6366f1;">Hello {lead.get('owner_name', 'there')}!</h2>
-                    <p>I noticed your business, <strong>{lead.get('business_name')}</strong>, and wanted to reach out.</p>
-                    <p>We specialize in providing cutting-edge solutions for roofing contractors like yourself.</p>
-                    <p>Would you be interested in a quick 15-minute call to discuss how we can help grow your business?</p>
-                    <br>
-                    <p>Best regards,<br>Your Name<br>Company Name</p>
-                    <hr style="border: 1px solid #eee; margin: 20px 0;">
-                    <p style="font-size: 12px; color: #888;">
-                        You received this email because your business is listed on Google Maps.
-                        <a href="#">Unsubscribe</a>
-                    </p>
-                </body>
-                </html>
-            """,
-            "partnership": f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <h2 style="color: #6366f1;">Partnership Opportunity for {lead.get('business_name')}</h2>
-                    <p>Hi {lead.get('owner_name')},</p>
-                    <p>We're looking for top-rated roofing contractors to partner with in {lead.get('city')}, {lead.get('state')}.</p>
-                    <p>Your {lead.get('rating', 5.0)}⭐ rating caught our attention!</p>
-                    <p><strong>What we offer:</strong></p>
-                    <ul>
-                        <li>Exclusive lead generation</li>
-                        <li>Marketing support</li>
-                        <li>Technology solutions</li>
-                    </ul>
-                    <p>Interested? Let's schedule a call.</p>
-                    <br>
-                    <p>Best regards,<br>Partnership Team</p>
-                </body>
-                </html>
-            """,
-            "demo": f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <h2 style="color: #6366f1;">Free Demo for {lead.get('business_name')}</h2>
-                    <p>Hi {lead.get('owner_name')},</p>
-                    <p>We have a powerful tool that's helping roofing contractors increase efficiency by 40%.</p>
-                    <p>I'd love to show you a quick demo - no commitment required.</p>
-                    <p><a href="#" style="background: #6366f1; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; display: inline-block;">Book Your Demo</a></p>
-                    <br>
-                    <p>Looking forward to connecting,<br>Sales Team</p>
-                </body>
-                </html>
-            """,
-            "followup": f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <h2 style="color: #6366f1;">Following Up</h2>
-                    <p>Hi {lead.get('owner_name')},</p>
-                    <p>I wanted to follow up on my previous message about helping {lead.get('business_name')} grow.</p>
-                    <p>Quick question: What's your biggest challenge right now in growing your roofing business?</p>
-                    <p>Happy to share some insights that might help.</p>
-                    <br>
-                    <p>Best,<br>Your Name</p>
-                </body>
-                </html>
-            """
-        }
-        
-        return templates.get(template_type, templates["intro"])
+        return self.templates.render_body(template_type, lead)
     
     def get_subject(self, template_type: str, lead: dict) -> str:
         """Get email subject line"""
-        subjects = {
-            "intro": f"Quick question about {lead.get('business_name')}",
-            "partnership": f"Partnership opportunity in {lead.get('city')}",
-            "demo": "Free demo - 40% efficiency boost for your roofing business",
-            "followup": "Following up on our conversation"
-        }
-        return subjects.get(template_type, "Reaching out")
+        return self.templates.render_subject(template_type, lead)
+
+    def register_template(self, name: str, html_body: str, subject: str = None):
+        """Register a runtime template, shared by every campaign"""
+        self.templates.register(name, html_body, subject)
+
+    def pool_stats(self) -> dict:
+        """Per-connection throughput of the SMTP pool"""
+        return self.pool.stats()
+
+    def close(self):
+        """Release pooled SMTP connections"""
+        self.pool.close()
 
 
 # For testing
@@ -185,3 +429,5 @@ if __name__ == "__main__":
     )
     
     print(result)
+    print(service.pool_stats())
+    service.close()
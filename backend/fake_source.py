@@ -0,0 +1,115 @@
+"""
+Local stand-in for an upstream lead API, used to exercise the scraping
+pipeline offline. Serves deterministic pages of leads as JSON with
+optional latency and a configurable share of 503 responses.
+
+    python fake_source.py --port 8099 --latency 0.05 --failure-rate 0.1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from lead_store import normalize_state
+
+CITIES = {
+    "TX": ["Houston", "Dallas", "Austin", "San Antonio"],
+    "AZ": ["Phoenix", "Tucson"],
+    "FL": ["Miami", "Tampa", "Jacksonville"],
+    "GA": ["Atlanta", "Savannah"],
+}
+
+
+def fake_lead(industry: str, location: str, index: int) -> dict:
+    state = normalize_state(location) or "TX"
+    cities = CITIES.get(state, [location.title() or "Springfield"])
+    city = cities[index % len(cities)]
+    return {
+        "id": f"SRC-{state}-{index}",
+        "business_name": f"{industry.title()} Pros #{index} - {city}",
+        "owner_name": f"Owner {index}",
+        "phone": f"+1-555-{index % 1000:03d}-{index % 10000:04d}",
+        "email": f"owner{index}@{state.lower()}-pros{index}.com",
+        "address": f"{100 + index % 9000} Main Street",
+        "city": city,
+        "state": state,
+        "zip_code": f"{10000 + index % 89999}",
+        "rating": round(3.5 + (index % 16) / 10, 1),
+        "reviews": 10 + index % 490,
+        "website": f"www.{state.lower()}-pros{index}.com",
+        "verified": index % 4 != 0,
+        "industry": industry
+    }
+
+
+class FakeLeadServer:
+    def __init__(self, host: str = "localhost", port: int = 0,
+                 latency: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    fail = server._random.random() < server.failure_rate
+                if server.latency:
+                    time.sleep(server.latency)
+                if fail:
+                    self.send_error(503)
+                    return
+                query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                page = int(query.get("page", 0))
+                page_size = int(query.get("page_size", 50))
+                start = page * page_size
+                leads = [
+                    fake_lead(query.get("industry", "Roofing Contractors"), query.get("location", ""), i)
+                    for i in range(start, start + page_size)
+                ]
+                body = json.dumps({"page": page, "leads": leads}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/leads"
+
+    def start(self) -> "FakeLeadServer":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeLeadServer(port=args.port, latency=args.latency, failure_rate=args.failure_rate)
+    print(f"Fake lead source on {fake.url}")
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
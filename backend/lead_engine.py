@@ -0,0 +1,147 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from lead_store import normalize_key, normalize_state
+from lead_table import LeadRow
+
+
+class _Categories:
+    """Normalized string -> small integer code, with a cache on the raw string"""
+
+    def __init__(self, normalize):
+        self.normalize = normalize
+        self.keys: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._raw: Dict[Optional[str], int] = {}
+
+    def code(self, raw: Optional[str]) -> int:
+        code = self._raw.get(raw)
+        if code is None:
+            key = self.normalize(raw)
+            code = self._codes.setdefault(key, len(self.keys))
+            if code == len(self.keys):
+                self.keys.append(key)
+            self._raw[raw] = code
+        return code
+
+    def matching(self, predicate) -> np.ndarray:
+        return np.array([code for code, key in enumerate(self.keys) if predicate(key)], dtype=np.int32)
+
+
+class LeadQueryEngine:
+    """
+    Vectorized filtering and ranking over a ``LeadStore``.
+
+    Keeps NumPy copies of the columns queries touch: state, city and
+    industry as integer category codes, rating, reviews and verified as
+    numeric arrays. Filters become boolean masks, and ranking scores
+    every match as ``rating * log1p(reviews) * weight`` (``verified_weight``
+    for verified leads, 1 otherwise) and picks the top ``limit`` with
+    ``argpartition`` instead of sorting all of them.
+
+    The arrays grow with spare capacity and are synced from the store
+    before each query, so new leads cost an append rather than a rebuild.
+    """
+
+    def __init__(self, store, verified_weight: float = 1.5):
+        self.store = store
+        self.verified_weight = verified_weight
+        self.states = _Categories(lambda s: normalize_state(s) or normalize_key(s).upper())
+        self.cities = _Categories(normalize_key)
+        self.industries = _Categories(lambda s: s)
+        self._size = 0
+        self._arrays = {
+            "state": np.empty(0, dtype=np.int32),
+            "city": np.empty(0, dtype=np.int32),
+            "industry": np.empty(0, dtype=np.int32),
+            "rating": np.empty(0, dtype=np.float64),
+            "reviews": np.empty(0, dtype=np.int64),
+            "verified": np.empty(0, dtype=np.bool_)
+        }
+
+    def _sync(self):
+        table = self.store._table
+        start, end = self._size, len(table)
+        if start == end:
+            return
+        if end > len(self._arrays["rating"]):
+            capacity = max(end, 2 * len(self._arrays["rating"]), 1024)
+            for name, values in self._arrays.items():
+                grown = np.empty(capacity, dtype=values.dtype)
+                grown[:start] = values[:start]
+                self._arrays[name] = grown
+
+        columns = table.columns
+        arrays = self._arrays
+        arrays["state"][start:end] = [self.states.code(s) for s in columns["state"][start:end]]
+        arrays["city"][start:end] = [self.cities.code(c) for c in columns["city"][start:end]]
+        arrays["industry"][start:end] = [self.industries.code(i) for i in self.store._industry_of[start:end]]
+        arrays["rating"][start:end] = np.frombuffer(columns["rating"][start:end], dtype=np.float64)
+        arrays["reviews"][start:end] = np.frombuffer(
+            columns["reviews"][start:end], dtype=np.dtype(columns["reviews"].typecode)
+        )
+        arrays["verified"][start:end] = np.frombuffer(columns["verified"][start:end], dtype=np.bool_)
+        self._size = end
+
+    def preload(self):
+        """Build the column arrays for every stored lead now instead of on the first query"""
+        self._sync()
+
+    def mask(self, location: Optional[str] = None, industry: Optional[str] = None,
+             verified_only: bool = False, min_rating: Optional[float] = None,
+             min_reviews: Optional[int] = None) -> np.ndarray:
+        """Boolean mask over store positions; filters match ``LeadStore.query``"""
+        self._sync()
+        size = self._size
+        arrays = {name: values[:size] for name, values in self._arrays.items()}
+        # Tombstones change in place, so the live flags are re-read every time
+        mask = np.frombuffer(bytes(self.store._live), dtype=np.bool_)[:size].copy()
+
+        if location:
+            key = normalize_key(location)
+            where = np.isin(arrays["city"], self.cities.matching(lambda city: key in city))
+            state = normalize_state(key)
+            if state is not None:
+                where |= np.isin(arrays["state"], self.states.matching(lambda code: code == state))
+            mask &= where
+        if normalize_key(industry):
+            key = normalize_key(industry)
+            mask &= np.isin(arrays["industry"], self.industries.matching(lambda name: key in name))
+        if verified_only:
+            mask &= arrays["verified"]
+        if min_rating is not None:
+            mask &= arrays["rating"] >= min_rating
+        if min_reviews is not None:
+            mask &= arrays["reviews"] >= min_reviews
+        return mask
+
+    def scores(self, positions: np.ndarray) -> np.ndarray:
+        rating = self._arrays["rating"][positions]
+        reviews = self._arrays["reviews"][positions]
+        weight = np.where(self._arrays["verified"][positions], self.verified_weight, 1.0)
+        return rating * np.log1p(reviews) * weight
+
+    def search(self, limit: int, rank: bool = False, **filters) -> np.ndarray:
+        """
+        Positions of up to ``limit`` matches: the first ones in insertion
+        order, or with ``rank`` the highest-scoring ones, best first.
+        """
+        positions = np.flatnonzero(self.mask(**filters))
+        if limit <= 0:
+            return positions[:0]
+        if not rank:
+            return positions[:limit]
+        scores = self.scores(positions)
+        if len(positions) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(positions))
+        # Stable sort over ascending indexes keeps insertion order among equal scores
+        top.sort()
+        order = top[np.argsort(-scores[top], kind="stable")]
+        return positions[order]
+
+    def rows(self, positions: np.ndarray) -> List[LeadRow]:
+        table = self.store._table
+        return [LeadRow(table, position) for position in positions.tolist()]
@@ -0,0 +1,210 @@
+"""
+Fast, seedable synthetic lead generator for load tests.
+
+Produces columnar batches (column name -> list of values, in
+``storage.LEAD_COLUMNS`` order) built with whole-column comprehensions
+instead of one ``Lead`` model per row, and writes them to the SQLite
+store, CSV, or Parquet when pyarrow is installed.
+
+    python lead_generator.py --count 5000000 --seed 42 --db leads.db
+    python lead_generator.py --count 1000000 --states TX,FL --dup-rate 0.05 --csv leads.csv
+"""
+import argparse
+import csv
+import random
+import time
+from typing import Dict, Iterator, Optional, Sequence
+
+from lead_store import normalize_state
+from storage import LEAD_COLUMNS
+
+# Two large cities per state
+STATE_CITIES = {
+    "AL": ["Birmingham", "Montgomery"], "AK": ["Anchorage", "Fairbanks"],
+    "AZ": ["Phoenix", "Tucson"], "AR": ["Little Rock", "Fayetteville"],
+    "CA": ["Los Angeles", "San Diego"], "CO": ["Denver", "Colorado Springs"],
+    "CT": ["Bridgeport", "Hartford"], "DE": ["Wilmington", "Dover"],
+    "FL": ["Jacksonville", "Miami"], "GA": ["Atlanta", "Savannah"],
+    "HI": ["Honolulu", "Hilo"], "ID": ["Boise", "Meridian"],
+    "IL": ["Chicago", "Aurora"], "IN": ["Indianapolis", "Fort Wayne"],
+    "IA": ["Des Moines", "Cedar Rapids"], "KS": ["Wichita", "Overland Park"],
+    "KY": ["Louisville", "Lexington"], "LA": ["New Orleans", "Baton Rouge"],
+    "ME": ["Portland", "Bangor"], "MD": ["Baltimore", "Frederick"],
+    "MA": ["Boston", "Worcester"], "MI": ["Detroit", "Grand Rapids"],
+    "MN": ["Minneapolis", "Saint Paul"], "MS": ["Jackson", "Gulfport"],
+    "MO": ["Kansas City", "St. Louis"], "MT": ["Billings", "Missoula"],
+    "NE": ["Omaha", "Lincoln"], "NV": ["Las Vegas", "Reno"],
+    "NH": ["Manchester", "Nashua"], "NJ": ["Newark", "Jersey City"],
+    "NM": ["Albuquerque", "Santa Fe"], "NY": ["New York", "Buffalo"],
+    "NC": ["Charlotte", "Raleigh"], "ND": ["Fargo", "Bismarck"],
+    "OH": ["Columbus", "Cleveland"], "OK": ["Oklahoma City", "Tulsa"],
+    "OR": ["Portland", "Eugene"], "PA": ["Philadelphia", "Pittsburgh"],
+    "RI": ["Providence", "Warwick"], "SC": ["Charleston", "Columbia"],
+    "SD": ["Sioux Falls", "Rapid City"], "TN": ["Nashville", "Memphis"],
+    "TX": ["Houston", "Dallas", "Austin", "San Antonio"], "UT": ["Salt Lake City", "Provo"],
+    "VT": ["Burlington", "Montpelier"], "VA": ["Virginia Beach", "Richmond"],
+    "WA": ["Seattle", "Spokane"], "WV": ["Charleston", "Huntington"],
+    "WI": ["Milwaukee", "Madison"], "WY": ["Cheyenne", "Casper"]
+}
+
+INDUSTRIES = ["Roofing Contractors", "Plumbers", "Electricians", "HVAC Contractors", "Landscapers"]
+NAME_PREFIXES = [
+    "Elite", "Summit", "Premier", "Skyline", "Apex", "Guardian", "Heritage", "Precision",
+    "Dynasty", "Victory", "Crown", "Liberty", "Eagle", "Pioneer", "Titan", "Patriot",
+    "Golden", "Ironclad", "Northstar", "Cardinal", "Falcon", "Keystone", "Evergreen", "Bluebird"
+]
+NAME_SUFFIXES = ["Group", "Co", "LLC", "Inc", "Services", "Pros", "Solutions", "Company"]
+FIRST_NAMES = ["John", "Michael", "David", "James", "Robert", "William", "Maria", "Linda",
+               "Sarah", "Karen", "Daniel", "Matthew", "Laura", "Emily", "Carlos", "Priya"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Davis", "Miller", "Wilson", "Moore",
+              "Taylor", "Anderson", "White", "Harris", "Garcia", "Martinez", "Nguyen", "Patel"]
+RATINGS = [r / 10 for r in range(35, 51)]
+STREETS = ["Main Street", "Oak Avenue", "Maple Drive", "Cedar Lane", "Elm Street", "Park Road"]
+
+
+def generate_lead_batches(count: int, batch_size: int = 100000, seed: Optional[int] = None,
+                          industries: Optional[Sequence[str]] = None,
+                          states: Optional[Sequence[str]] = None,
+                          duplicate_rate: float = 0.0, start_id: int = 0) -> Iterator[Dict[str, list]]:
+    """
+    Yield ``count`` synthetic leads as columnar batches.
+
+    The same ``seed`` always reproduces the same rows. ``duplicate_rate``
+    is the share of rows that re-list an earlier business from the same
+    batch (new ID, re-formatted phone, upper-cased email), for exercising
+    the dedupe stage.
+    """
+    rng = random.Random(seed)
+    industries = list(industries or INDUSTRIES)
+    state_codes = [normalize_state(s) or s.upper() for s in (states or STATE_CITIES)]
+    places = [(city, state) for state in state_codes for city in STATE_CITIES.get(state, [state])]
+    owners = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    slugs = {owner: owner.lower().replace(" ", ".") for owner in owners}
+
+    for batch_start in range(0, count, batch_size):
+        n = min(batch_size, count - batch_start)
+        first_id = start_id + batch_start
+        choices = rng.choices
+        randrange = rng.randrange
+
+        place = choices(places, k=n)
+        industry = choices(industries, k=n)
+        owner = choices(owners, k=n)
+        prefix = choices(NAME_PREFIXES, k=n)
+        suffix = choices(NAME_SUFFIXES, k=n)
+        getrandbits = rng.getrandbits
+        numbers = [getrandbits(34) for _ in range(n)]
+
+        business = [f"{p} {i.split()[0]} {s} #{first_id + k}" for k, (p, i, s) in enumerate(zip(prefix, industry, suffix))]
+        domain = [f"{p.lower()}{first_id + k}.com" for k, p in enumerate(prefix)]
+        columns = {
+            "id": [f"LEAD-{first_id + k}" for k in range(n)],
+            "business_name": business,
+            "owner_name": owner,
+            "phone": [f"+1-{2 + x % 8}{x // 10 % 100:02d}-{x // 1000 % 1000:03d}-{x // 1000000 % 10000:04d}" for x in numbers],
+            "email": [f"{slugs[o]}@{d}" for o, d in zip(owner, domain)],
+            "address": [f"{100 + x % 9900} {STREETS[x % len(STREETS)]}" for x in numbers],
+            "city": [c for c, _ in place],
+            "state": [s for _, s in place],
+            "zip_code": [f"{10000 + x % 90000}" for x in numbers],
+            "rating": choices(RATINGS, k=n),
+            "reviews": [x % 500 + 1 for x in numbers],
+            "website": [f"www.{d}" for d in domain],
+            "verified": [x % 4 != 0 for x in numbers],
+            "industry": industry
+        }
+
+        if duplicate_rate > 0 and n > 1:
+            duplicates = [k for k in range(1, n) if rng.random() < duplicate_rate]
+            for k in duplicates:
+                source = randrange(k)
+                for column in ("business_name", "owner_name", "address", "city", "state",
+                               "zip_code", "website", "industry"):
+                    columns[column][k] = columns[column][source]
+                digits = columns["phone"][source].replace("+1-", "").replace("-", "")
+                columns["phone"][k] = f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+                columns["email"][k] = columns["email"][source].upper()
+
+        yield columns
+
+
+def batch_rows(batch: Dict[str, list]) -> Iterator[tuple]:
+    """Row tuples of a columnar batch, in ``LEAD_COLUMNS`` order"""
+    return zip(*(batch[column] for column in LEAD_COLUMNS))
+
+
+def write_csv(batches, path: str) -> int:
+    written = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(LEAD_COLUMNS)
+        for batch in batches:
+            writer.writerows(batch_rows(batch))
+            written += len(batch["id"])
+    return written
+
+
+def write_parquet(batches, path: str) -> int:
+    """Write batches as Parquet row groups (requires pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet output requires pyarrow: pip install pyarrow")
+
+    written = 0
+    writer = None
+    try:
+        for batch in batches:
+            table = pa.table({column: batch[column] for column in LEAD_COLUMNS})
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            written += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def write_database(batches, database) -> int:
+    written = 0
+    for batch in batches:
+        written += database.bulk_insert_rows(batch_rows(batch))
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic leads for load testing")
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=100000)
+    parser.add_argument("--industries", help="comma-separated industry names")
+    parser.add_argument("--states", help="comma-separated state codes or names")
+    parser.add_argument("--dup-rate", type=float, default=0.0)
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--db", help="SQLite database path (same schema as the API)")
+    output.add_argument("--csv", help="CSV output path")
+    output.add_argument("--parquet", help="Parquet output path (needs pyarrow)")
+    args = parser.parse_args()
+
+    batches = generate_lead_batches(
+        args.count,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        industries=args.industries.split(",") if args.industries else None,
+        states=args.states.split(",") if args.states else None,
+        duplicate_rate=args.dup_rate
+    )
+    started = time.perf_counter()
+    if args.db:
+        from storage import Database
+        database = Database(args.db)
+        written = write_database(batches, database)
+        database.close()
+    elif args.csv:
+        written = write_csv(batches, args.csv)
+    else:
+        written = write_parquet(batches, args.parquet)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written:,} leads in {elapsed:.1f}s ({written / elapsed:,.0f} leads/s)")
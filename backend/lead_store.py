@@ -0,0 +1,146 @@
+import heapq
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lead_table import LeadRow, LeadTable
+
+# Full state name -> USPS abbreviation (50 states + DC)
+STATE_ABBREVIATIONS = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR",
+    "california": "CA", "colorado": "CO", "connecticut": "CT", "delaware": "DE",
+    "florida": "FL", "georgia": "GA", "hawaii": "HI", "idaho": "ID",
+    "illinois": "IL", "indiana": "IN", "iowa": "IA", "kansas": "KS",
+    "kentucky": "KY", "louisiana": "LA", "maine": "ME", "maryland": "MD",
+    "massachusetts": "MA", "michigan": "MI", "minnesota": "MN", "mississippi": "MS",
+    "missouri": "MO", "montana": "MT", "nebraska": "NE", "nevada": "NV",
+    "new hampshire": "NH", "new jersey": "NJ", "new mexico": "NM", "new york": "NY",
+    "north carolina": "NC", "north dakota": "ND", "ohio": "OH", "oklahoma": "OK",
+    "oregon": "OR", "pennsylvania": "PA", "rhode island": "RI", "south carolina": "SC",
+    "south dakota": "SD", "tennessee": "TN", "texas": "TX", "utah": "UT",
+    "vermont": "VT", "virginia": "VA", "washington": "WA", "west virginia": "WV",
+    "wisconsin": "WI", "wyoming": "WY", "district of columbia": "DC"
+}
+STATE_CODES = set(STATE_ABBREVIATIONS.values())
+
+
+def normalize_key(value: Optional[str]) -> str:
+    return " ".join((value or "").split()).casefold()
+
+
+def normalize_state(location: Optional[str]) -> Optional[str]:
+    """Map a state name or abbreviation ("texas", "Tx") to its code ("TX")"""
+    key = normalize_key(location)
+    if key.upper() in STATE_CODES:
+        return key.upper()
+    return STATE_ABBREVIATIONS.get(key)
+
+
+class LeadStore:
+    """
+    In-memory lead table with state, city and industry indexes.
+
+    Each index maps a normalized key to the ascending insertion positions
+    of its leads, so a query merges a handful of posting lists and stops
+    after ``limit`` hits; its cost follows the result size rather than
+    the number of stored leads. Leads are duck-typed: anything with
+    ``Lead``'s attributes can be added. They are copied into a columnar
+    ``LeadTable`` and returned as ``LeadRow`` views.
+
+    A hash index on ``id`` backs point and batch lookups. Re-adding an
+    existing ID replaces the lead: the old position becomes a tombstone
+    that queries skip.
+    """
+
+    def __init__(self, leads: Iterable = ()):
+        self._table = LeadTable()
+        self._live = bytearray()
+        self._by_state: Dict[str, List[int]] = {}
+        self._by_city: Dict[str, List[int]] = {}
+        self._by_industry: Dict[str, List[int]] = {}
+        self._industry_of: List[str] = []
+        self._by_id: Dict[str, int] = {}
+        self.add_many(leads)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[LeadRow]:
+        live = self._live
+        return (row for row in self._table.rows() if live[row._position])
+
+    def __contains__(self, lead_id: str) -> bool:
+        return lead_id in self._by_id
+
+    def add(self, lead):
+        position = self._table.append(lead)
+        self._live.append(1)
+        replaced = self._by_id.get(lead.id)
+        if replaced is not None:
+            self._live[replaced] = 0
+        self._by_id[lead.id] = position
+        self._by_state.setdefault(normalize_state(lead.state) or normalize_key(lead.state).upper(), []).append(position)
+        self._by_city.setdefault(normalize_key(lead.city), []).append(position)
+        industry = self._table.intern(normalize_key(getattr(lead, "industry", None)))
+        self._by_industry.setdefault(industry, []).append(position)
+        self._industry_of.append(industry)
+
+    def add_many(self, leads: Iterable):
+        for lead in leads:
+            self.add(lead)
+
+    def get(self, lead_id: str) -> Optional[LeadRow]:
+        position = self._by_id.get(lead_id)
+        return None if position is None else LeadRow(self._table, position)
+
+    def get_many(self, lead_ids: Iterable[str]) -> Tuple[List[LeadRow], List[str]]:
+        """
+        Batch lookup by ID: returns the leads found (in request order,
+        duplicates dropped) and the IDs that are not in the store.
+        """
+        found, missing = [], []
+        by_id, table = self._by_id, self._table
+        for lead_id in dict.fromkeys(lead_ids):
+            position = by_id.get(lead_id)
+            if position is None:
+                missing.append(lead_id)
+            else:
+                found.append(LeadRow(table, position))
+        return found, missing
+
+    def _location_postings(self, location: str) -> List[List[int]]:
+        """Posting lists for a state code/name or a (partial) city name"""
+        key = normalize_key(location)
+        postings = []
+        state = normalize_state(key)
+        if state in self._by_state:
+            postings.append(self._by_state[state])
+        # City matching is by substring, so scan the distinct city names
+        # (a few thousand at most), never the leads themselves
+        postings.extend(positions for city, positions in self._by_city.items() if key in city)
+        return postings
+
+    def _industries(self, industry: Optional[str]) -> Optional[set]:
+        """Distinct industry keys matching ``industry``; None means no filter"""
+        key = normalize_key(industry)
+        if not key:
+            return None
+        return {name for name in self._by_industry if key in name}
+
+    def query(self, location: str, industry: Optional[str] = None, limit: Optional[int] = None) -> List[LeadRow]:
+        """Leads matching ``location`` (and ``industry``) in insertion order"""
+        postings = self._location_postings(location)
+        industries = self._industries(industry)
+
+        results = []
+        last = -1
+        for position in heapq.merge(*postings):
+            if position == last:
+                continue
+            last = position
+            if industries is not None and self._industry_of[position] not in industries:
+                continue
+            if not self._live[position]:
+                continue
+            results.append(LeadRow(self._table, position))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
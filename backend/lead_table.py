@@ -0,0 +1,96 @@
+from array import array
+from typing import Dict, Iterator, Optional
+
+from models import Lead
+
+# Columns whose values repeat heavily across leads; stored once per table
+INTERNED_COLUMNS = ("owner_name", "city", "state", "zip_code", "industry")
+STRING_COLUMNS = ("id", "business_name", "phone", "email", "address", "website")
+LEAD_FIELDS = tuple(Lead.model_fields)
+
+
+class LeadTable:
+    """
+    Compact columnar storage for leads.
+
+    Each field is one column indexed by position: unique strings (id,
+    name, phone, ...) are plain lists, low-cardinality strings (city,
+    state, industry, ...) are lists of references into a per-table
+    string pool, and rating/reviews/verified live in typed arrays. A
+    stored lead costs a few list slots and array cells instead of a
+    pydantic model with its own ``__dict__``, fields-set and boxed
+    numbers. Rows are read back through ``LeadRow`` views.
+    """
+
+    def __init__(self):
+        self.columns: Dict[str, list] = {name: [] for name in STRING_COLUMNS + INTERNED_COLUMNS}
+        self.columns["rating"] = array("d")
+        self.columns["reviews"] = array("l")
+        self.columns["verified"] = bytearray()
+        self._pool: Dict[str, str] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def intern(self, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        return self._pool.setdefault(value, value)
+
+    def append(self, lead) -> int:
+        """Copy ``lead`` (any object with Lead attributes) in; returns its position"""
+        columns = self.columns
+        for name in STRING_COLUMNS:
+            columns[name].append(getattr(lead, name, None))
+        for name in INTERNED_COLUMNS:
+            columns[name].append(self.intern(getattr(lead, name, None)))
+        columns["rating"].append(getattr(lead, "rating", 0.0) or 0.0)
+        columns["reviews"].append(getattr(lead, "reviews", 0) or 0)
+        columns["verified"].append(1 if getattr(lead, "verified", False) else 0)
+        self._size += 1
+        return self._size - 1
+
+    def row(self, position: int) -> "LeadRow":
+        return LeadRow(self, position)
+
+    def rows(self) -> Iterator["LeadRow"]:
+        return (LeadRow(self, position) for position in range(self._size))
+
+
+class LeadRow:
+    """Read-only view of one ``LeadTable`` row with ``Lead``'s attributes"""
+    __slots__ = ("_table", "_position")
+
+    def __init__(self, table: LeadTable, position: int):
+        self._table = table
+        self._position = position
+
+    def to_dict(self) -> dict:
+        """The row in the ``Lead`` API shape"""
+        return {name: getattr(self, name) for name in LEAD_FIELDS}
+
+    def to_model(self) -> Lead:
+        return Lead(**self.to_dict())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LeadRow):
+            return self._table is other._table and self._position == other._position
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._table), self._position))
+
+    def __repr__(self) -> str:
+        return f"LeadRow({self.id!r})"
+
+
+def _column_property(name: str, convert=None) -> property:
+    if convert is None:
+        return property(lambda row: row._table.columns[name][row._position])
+    return property(lambda row: convert(row._table.columns[name][row._position]))
+
+
+for _name in STRING_COLUMNS + INTERNED_COLUMNS + ("rating", "reviews"):
+    setattr(LeadRow, _name, _column_property(_name))
+LeadRow.verified = _column_property("verified", bool)
@@ -1,17 +1,56 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from typing import List, Optional
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+import time
 import uvicorn
 from datetime import datetime
 import random
+import threading
 from email_service import EmailService
+from dispatcher import CampaignDispatcher
+from campaign_jobs import CampaignJobManager
+from lead_store import LeadStore, normalize_key, normalize_state
+from lead_engine import LeadQueryEngine
+from cache import ResultCache
+from dedupe import LeadDeduplicator
+from models import LeadFilter, Lead, EmailCampaign, EmailTemplate
+from storage import Database, LEAD_COLUMNS
+from scraping import HTTPJSONSource, ScrapePipeline
+from metrics import MetricsMiddleware, registry as metrics_registry
+from profiler import SamplingProfiler
+from workers import serve
 
 app = FastAPI(title="B2B Lead Scraper API")
 
+# Persistent storage for leads and campaigns
+database = Database(os.getenv("DATABASE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "leads.db")))
+
 # Initialize email service
 email_service = EmailService()
+dispatcher = CampaignDispatcher(email_service)
+campaign_jobs = CampaignJobManager(
+    dispatcher,
+    database,
+    on_change=database.save_campaign,
+    claim_size=int(os.getenv("CAMPAIGN_CLAIM_SIZE", "1000")),
+    record_size=int(os.getenv("CAMPAIGN_RECORD_SIZE", "100")),
+    record_interval=float(os.getenv("CAMPAIGN_RECORD_INTERVAL", "0.25")),
+    lease_ttl=float(os.getenv("CAMPAIGN_LEASE_TTL", "30")),
+    # A campaign taken over from another worker may use a template it registered
+    on_adopt=lambda: sync_shared_state(force=True)
+)
+metrics_registry.gauge(
+    "campaign_send_queue_recipients",
+    "Durable send queue rows of unfinished campaigns, by state",
+    ("state",)
+).set_function(campaign_jobs.queue_depth)
 
 # CORS middleware
 app.add_middleware(
@@ -22,31 +61,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Models
-class LeadFilter(BaseModel):
-    industry: str
-    location: str
-    limit: int = 50
-
-class Lead(BaseModel):
-    id: str
-    business_name: str
-    owner_name: str
-    phone: str
-    email: str
-    address: str
-    city: str
-    state: str
-    zip_code: str
-    rating: float
-    reviews: int
-    website: Optional[str]
-    verified: bool
-
-class EmailCampaign(BaseModel):
-    campaign_name: str
-    template: str
-    lead_ids: List[str]
+# Per-endpoint latency histograms, served with the other metrics on /metrics
+app.add_middleware(MetricsMiddleware)
+
+SCRAPE_PHASE_DURATION = metrics_registry.histogram(
+    "scrape_phase_duration_seconds",
+    "Time spent in each /api/scrape phase on a cache miss: pipeline, query, serialize",
+    ("phase",)
+)
+SCRAPE_CACHE_REQUESTS = metrics_registry.counter(
+    "scrape_cache_requests",
+    "/api/scrape requests by result cache outcome: hit, coalesced or miss",
+    ("result",)
+)
+
+# Sampling profiler; its /debug/profiler endpoints exist only with PROFILER_ENABLED=1
+profiler = SamplingProfiler(interval=float(os.getenv("PROFILER_INTERVAL", "0.005")))
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0").lower() in ("1", "true", "yes")
 
 # Sample data generator
 def generate_sample_leads(count: int = 50):
@@ -104,9 +135,114 @@ def generate_sample_leads(count: int = 50):
     
     return leads
 
-# In-memory storage for demo
-demo_leads = generate_sample_leads(100)
-campaigns = []
+# Seed the demo dataset on first run
+if database.count_leads() == 0:
+    database.bulk_insert_leads(generate_sample_leads(100))
+
+# In-memory query index over the stored leads, used by /api/scrape
+lead_rowid = database.max_lead_rowid()
+lead_store = LeadStore(database.iter_leads())
+
+# Vectorized filters and ranking for /api/scrape requests beyond location/industry
+lead_engine = LeadQueryEngine(lead_store, verified_weight=float(os.getenv("SCORE_VERIFIED_WEIGHT", "1.5")))
+
+# Normalize-and-dedupe stage for ingest; stored leads are looked up in the
+# database's key indexes, and a city's names are indexed on first use
+deduplicator = LeadDeduplicator(stored=database)
+# Ingest runs the deduplicator in worker threads
+dedupe_lock = threading.Lock()
+
+# Runtime templates persist in the database and are shared by every worker
+template_version = 0
+for stored in database.templates_after():
+    email_service.register_template(stored["name"], stored["html_body"], stored["subject"])
+    template_version = stored["version"]
+
+# Multi-worker mode (WEB_CONCURRENCY > 1): forked workers share the database
+# and catch up on leads and templates written by the others
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+if WORKERS > 1 and not hasattr(os, "fork"):
+    print(f"WEB_CONCURRENCY={WORKERS} needs os.fork, which this platform lacks; serving from one process")
+    WORKERS = 1
+SHARED_STATE = WORKERS > 1
+SHARED_SYNC_INTERVAL = float(os.getenv("SHARED_SYNC_INTERVAL", "1.0"))
+SHARED_SYNC_BATCH = int(os.getenv("SHARED_SYNC_BATCH", "5000"))
+shared_sync_lock = asyncio.Lock()
+shared_synced_at = 0.0
+
+def fetch_shared_leads(after: int) -> tuple:
+    """Blocking half of a sync: the next batch of stored leads after rowid ``after``"""
+    leads, after = database.leads_after(after, SHARED_SYNC_BATCH)
+    with dedupe_lock:
+        deduplicator.add_stored(leads)
+    return leads, after
+
+async def sync_shared_state(force: bool = False):
+    """
+    Add leads and templates other workers have stored since the last
+    sync, at most every SHARED_SYNC_INTERVAL seconds. Only new lead rows
+    are picked up; another worker's update to an existing lead shows up
+    here after a restart. Rows are read, and their names indexed for
+    dedupe, in a thread SHARED_SYNC_BATCH at a time; the scrape index is
+    updated on the loop.
+    """
+    global lead_rowid, template_version, shared_synced_at
+    if not SHARED_STATE:
+        return
+    async with shared_sync_lock:
+        if not force and time.monotonic() - shared_synced_at < SHARED_SYNC_INTERVAL:
+            return
+        shared_synced_at = time.monotonic()
+        while True:
+            leads, lead_rowid = await asyncio.to_thread(fetch_shared_leads, lead_rowid)
+            lead_store.add_many(leads)
+            if len(leads) < SHARED_SYNC_BATCH:
+                break
+        for stored in await asyncio.to_thread(database.templates_after, template_version):
+            email_service.register_template(stored["name"], stored["html_body"], stored["subject"])
+            template_version = stored["version"]
+
+def store_leads(leads: List[Lead]) -> tuple:
+    """Normalize, dedupe and persist leads (blocking); returns them and the rows written"""
+    # Written before the lock is released: the next batch finds their keys in the database
+    with dedupe_lock:
+        leads = list(deduplicator.process(leads))
+        return leads, database.bulk_insert_leads(leads)
+
+async def ingest_leads(leads: List[Lead]) -> int:
+    """Store leads from a thread, then add them to the scrape index"""
+    leads, written = await asyncio.to_thread(store_leads, leads)
+    # The index is only changed on the event loop, where /api/scrape reads it
+    if SHARED_STATE:
+        # New rows arrive through the sync like any other worker's; updates apply here
+        lead_store.add_many(lead for lead in leads if lead.id in lead_store)
+        await sync_shared_state(force=True)
+    else:
+        lead_store.add_many(leads)
+    return written
+
+# Upstream sources for /api/scrape (comma-separated JSON endpoints, e.g. fake_source.py)
+scrape_sources = [
+    HTTPJSONSource(url.strip(), name=f"source-{i + 1}",
+                   max_concurrency=int(os.getenv("SCRAPE_CONCURRENCY", "4")),
+                   rate=float(os.getenv("SCRAPE_RATE", "0")))
+    for i, url in enumerate(os.getenv("SCRAPE_SOURCES", "").split(",")) if url.strip()
+]
+scrape_pipeline = ScrapePipeline(scrape_sources, ingest_leads) if scrape_sources else None
+
+# Cached /api/scrape lead payloads, bounded by an estimate of their size in bytes
+scrape_cache = ResultCache(
+    ttl=float(os.getenv("SCRAPE_CACHE_TTL", "300")),
+    max_weight=int(os.getenv("SCRAPE_CACHE_MAX_MB", "64")) * 1024 * 1024,
+    weigh=lambda result: 512 + sum(
+        sys.getsizeof(value) for lead in result["leads"] for value in lead.values()
+    )
+)
+
+def scrape_cache_key(filters: LeadFilter) -> tuple:
+    location = normalize_state(filters.location) or normalize_key(filters.location)
+    return (normalize_key(filters.industry), location, filters.limit, filters.verified_only,
+            filters.min_rating, filters.min_reviews, filters.rank)
 
 @app.get("/")
 def root():
@@ -116,8 +252,12 @@ def root():
         "endpoints": {
             "scrape": "/api/scrape",
             "leads": "/api/leads",
+            "export": "/api/leads/export",
             "campaigns": "/api/campaigns",
-            "stats": "/api/stats"
+            "stats": "/api/stats",
+            "templates": "/api/templates",
+            "email_pool": "/api/email/pool",
+            "metrics": "/metrics"
         }
     }
 
@@ -126,103 +266,201 @@ async def scrape_leads(filters: LeadFilter):
     """
     Simulate scraping leads from Google Maps/Apify
     In production, this would call Apify API or Google Maps scraper
+    
+    verified_only, min_rating and min_reviews narrow the matches; rank
+    returns the highest-scoring ones (rating x log reviews, verified
+    leads weighted up) instead of the first ones found.
+    
+    Identical queries within SCRAPE_CACHE_TTL seconds are answered from
+    the result cache, and concurrent identical queries share one run.
     """
-    # Normalize location for matching
-    location_lower = filters.location.lower().strip()
+    await sync_shared_state()
     
-    # Filter leads by location (match state code, state name, or city)
-    filtered_leads = []
-    for lead in demo_leads:
-        # Check if location matches state code, city, or if "texas" matches "TX"
-        state_match = (
-            location_lower == lead.state.lower() or  # Exact state code match
-            location_lower in lead.city.lower() or   # City name match
-            (location_lower == "texas" and lead.state == "TX") or  # Texas -> TX
-            (location_lower == "arizona" and lead.state == "AZ") or
-            (location_lower == "georgia" and lead.state == "GA") or
-            (location_lower == "florida" and lead.state == "FL") or
-            (location_lower == "tennessee" and lead.state == "TN") or
-            (location_lower == "colorado" and lead.state == "CO") or
-            (location_lower == "oregon" and lead.state == "OR") or
-            (location_lower == "nevada" and lead.state == "NV") or
-            (location_lower == "north carolina" and lead.state == "NC")
-        )
+    async def run_scrape():
+        # Pull fresh leads from the configured sources into the store first
+        started = time.perf_counter()
+        pipeline_stats = await scrape_pipeline.run(filters) if scrape_pipeline else None
+        queried = time.perf_counter()
+        SCRAPE_PHASE_DURATION.observe(queried - started, "pipeline")
         
-        if state_match:
-            filtered_leads.append(lead)
-            if len(filtered_leads) >= filters.limit:
-                break
+        if filters.rank or filters.verified_only or filters.min_rating is not None or filters.min_reviews is not None:
+            # Column masks plus score-based top-k over all matches
+            filtered_leads = lead_engine.rows(lead_engine.search(
+                filters.limit,
+                rank=filters.rank,
+                location=filters.location,
+                industry=filters.industry,
+                verified_only=filters.verified_only,
+                min_rating=filters.min_rating,
+                min_reviews=filters.min_reviews
+            ))
+        else:
+            # Indexed lookup by state code, state name, or city (plus industry)
+            filtered_leads = lead_store.query(filters.location, filters.industry, filters.limit)
+        serialized = time.perf_counter()
+        SCRAPE_PHASE_DURATION.observe(serialized - queried, "query")
+        
+        # Only what the cache key determines; the request's own filters are echoed below
+        payload = {
+            "pipeline": pipeline_stats,
+            "total_found": len(filtered_leads),
+            "leads": [lead.to_dict() for lead in filtered_leads],
+            "timestamp": datetime.now().isoformat()
+        }
+        SCRAPE_PHASE_DURATION.observe(time.perf_counter() - serialized, "serialize")
+        return payload
     
+    payload, cache_status = await scrape_cache.get_or_compute(scrape_cache_key(filters), run_scrape)
+    SCRAPE_CACHE_REQUESTS.inc(cache_status)
     return {
         "status": "success",
-        "scraping_source": "Google Maps + Apify",
+        "scraping_source": ", ".join(s.name for s in scrape_sources) if scrape_sources else "Google Maps + Apify",
+        "pipeline": payload["pipeline"],
         "industry": filters.industry,
         "location": filters.location,
-        "total_found": len(filtered_leads),
-        "leads": filtered_leads,
-        "timestamp": datetime.now().isoformat()
+        "total_found": payload["total_found"],
+        "leads": payload["leads"],
+        "timestamp": payload["timestamp"],
+        "cache": cache_status
     }
 
+@app.get("/api/scrape/dedupe")
+def get_dedupe_stats():
+    """Get ingest deduplication counters by match reason"""
+    return deduplicator.stats()
+
+@app.get("/api/scrape/cache")
+def get_scrape_cache():
+    """Get scrape result cache hit/miss/eviction counters"""
+    return scrape_cache.stats()
+
 @app.get("/api/leads")
-def get_leads(limit: int = 50, verified_only: bool = False):
-    """Get all scraped leads"""
-    leads = demo_leads if not verified_only else [l for l in demo_leads if l.verified]
+def get_leads(limit: int = Query(50, ge=1, le=1000), verified_only: bool = False,
+              cursor: Optional[int] = Query(None, ge=0)):
+    """Get scraped leads one page at a time; pass next_cursor back to continue"""
+    lead_stats = database.lead_stats()
+    leads, next_cursor = database.page_leads(limit, after=cursor or 0, verified_only=verified_only)
     return {
-        "total": len(leads),
-        "leads": leads[:limit]
+        "total": lead_stats["verified"] if verified_only else lead_stats["total"],
+        "leads": leads,
+        "next_cursor": next_cursor
     }
 
-@app.post("/api/campaigns")
-async def create_campaign(campaign: EmailCampaign):
-    """Create an email campaign and send emails via local SMTP"""
-    # Get leads for this campaign
-    selected_leads = [lead for lead in demo_leads if lead.id in campaign.lead_ids]
+@app.get("/api/leads/export")
+def export_leads(format: str = "csv", verified_only: bool = False):
+    """Stream every lead as CSV or NDJSON without loading them into memory"""
+    rows = database.iter_lead_rows(verified_only=verified_only)
+    if format == "ndjson":
+        return StreamingResponse(
+            (json.dumps(row) + "\n" for row in rows),
+            media_type="application/x-ndjson"
+        )
+    if format != "csv":
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
     
-    # Send emails using email service
-    email_results = email_service.send_campaign(
-        recipients=[{
-            "email": lead.email,
-            "business_name": lead.business_name,
-            "owner_name": lead.owner_name,
-            "city": lead.city,
-            "state": lead.state,
-            "rating": lead.rating
-        } for lead in selected_leads],
-        template=campaign.template
+    def csv_chunks(batch_size: int = 1000):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=LEAD_COLUMNS)
+        writer.writeheader()
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    return StreamingResponse(
+        csv_chunks(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=leads-export.csv"}
     )
+
+@app.post("/api/campaigns")
+async def create_campaign(campaign: EmailCampaign):
+    """Create an email campaign and queue its emails for background sending"""
+    await sync_shared_state()
+    # Get leads for this campaign from the in-memory ID index
+    selected_leads, unknown_lead_ids = lead_store.get_many(campaign.lead_ids)
+    if SHARED_STATE and (unknown_lead_ids or campaign.template not in email_service.templates):
+        # Possibly stored by another worker since the last sync
+        await sync_shared_state(force=True)
+        selected_leads, unknown_lead_ids = lead_store.get_many(campaign.lead_ids)
+    if campaign.template not in email_service.templates:
+        raise HTTPException(status_code=422, detail=f"Unknown template: {campaign.template}")
+    recipients = [{
+        "lead_id": lead.id,
+        "email": lead.email,
+        "business_name": lead.business_name,
+        "owner_name": lead.owner_name,
+        "city": lead.city,
+        "state": lead.state,
+        "rating": lead.rating
+    } for lead in selected_leads]
     
     campaign_data = {
-        "id": f"CAMP-{len(campaigns) + 1}",
+        # Drawn from a database sequence, so workers never hand out the same ID
+        "id": f"CAMP-{await asyncio.to_thread(database.next_sequence, 'campaign')}",
         "name": campaign.campaign_name,
         "template": campaign.template,
         "lead_count": len(campaign.lead_ids),
-        "status": "active",
+        "recipient_count": len(recipients),
+        "status": "queued",
         "created_at": datetime.now().isoformat(),
-        "emails_sent": email_results["sent"],
-        "emails_failed": email_results["failed"],
+        "emails_sent": 0,
+        "emails_failed": 0,
         "open_rate": 0,
         "response_rate": 0
     }
-    campaigns.append(campaign_data)
+    # Persist the send queue, then send in the background; progress is streamed separately
+    await campaign_jobs.submit(campaign_data, recipients)
     
     return {
         "status": "success",
-        "message": f"Campaign created! {email_results['sent']} emails sent to MailHog",
+        "message": f"Campaign queued! {campaign_data['recipient_count']} emails will be sent to MailHog",
         "campaign": campaign_data,
-        "email_results": email_results
+        "unknown_lead_ids": unknown_lead_ids,
+        "progress_url": f"/api/campaigns/{campaign_data['id']}/progress"
     }
 
+@app.get("/api/campaigns/{campaign_id}/progress")
+async def stream_campaign_progress(campaign_id: str):
+    """Stream campaign send progress as NDJSON until the campaign finishes"""
+    job = campaign_jobs.jobs.get(campaign_id)
+    if job is None:
+        # Sent by another worker (or finished before a restart): follow it in the database
+        if await asyncio.to_thread(database.get_campaign, campaign_id) is None:
+            raise HTTPException(status_code=404, detail=f"Campaign {campaign_id} not found")
+        updates = campaign_jobs.stream_stored(campaign_id)
+    else:
+        updates = campaign_jobs.stream(job)
+    
+    async def progress_lines():
+        async for progress in updates:
+            yield json.dumps(progress) + "\n"
+    
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
+@app.get("/api/campaigns/{campaign_id}/queue")
+def get_campaign_queue(campaign_id: str):
+    """Get per-state recipient counts from a campaign's durable send queue"""
+    counts = database.send_queue_counts(campaign_id)
+    if not any(counts.values()):
+        raise HTTPException(status_code=404, detail=f"Campaign {campaign_id} has no send queue")
+    return {"id": campaign_id, "queue": counts}
+
 @app.get("/api/campaigns")
 def get_campaigns():
-    """Get all email campaigns"""
-    # Simulate some activity for demo
-    for camp in campaigns:
-        if camp["status"] == "scheduled":
-            camp["status"] = "active"
-            camp["emails_sent"] = random.randint(1, camp["lead_count"])
-            camp["open_rate"] = round(random.uniform(15, 35), 1)
-            camp["response_rate"] = round(random.uniform(2, 8), 1)
-    
+    """Get all email campaigns with their queued/running/done status"""
+    # Campaigns still sending report their live in-memory counters, or the
+    # send queue's when another worker is sending them
+    campaigns = []
+    for c in database.list_campaigns():
+        if c["id"] in campaign_jobs.jobs:
+            c = campaign_jobs.jobs[c["id"]].campaign
+        elif c["status"] == "running":
+            c.update(campaign_jobs.queue_progress(c["id"]))
+        campaigns.append(c)
     return {
         "total": len(campaigns),
         "campaigns": campaigns
@@ -231,18 +469,114 @@ def get_campaigns():
 @app.get("/api/stats")
 def get_stats():
     """Get dashboard statistics"""
-    total_leads = len(demo_leads)
-    verified_leads = len([l for l in demo_leads if l.verified])
+    lead_stats = database.lead_stats()
+    campaign_status = database.campaign_status_counts()
     
     return {
-        "total_leads": total_leads,
-        "verified_leads": verified_leads,
-        "total_campaigns": len(campaigns),
-        "active_campaigns": len([c for c in campaigns if c.get("status") == "active"]),
-        "avg_rating": round(sum(l.rating for l in demo_leads) / total_leads, 2),
-        "states_covered": len(set(l.state for l in demo_leads)),
+        "total_leads": lead_stats["total"],
+        "verified_leads": lead_stats["verified"],
+        "total_campaigns": sum(campaign_status.values()),
+        "active_campaigns": campaign_status.get("queued", 0) + campaign_status.get("running", 0),
+        "avg_rating": round(lead_stats["avg_rating"] or 0, 2),
+        "states_covered": lead_stats["states"],
         "data_sources": ["Google Maps API", "Apify", "Apollo.io"]
     }
 
+@app.get("/api/stats/{group_by}")
+def get_grouped_stats(group_by: str):
+    """Get lead statistics grouped by state or industry"""
+    if group_by not in ("state", "industry"):
+        raise HTTPException(status_code=404, detail="Stats can be grouped by 'state' or 'industry'")
+    groups = database.grouped_lead_stats(group_by)
+    return {
+        "group_by": group_by,
+        "total": len(groups),
+        "groups": groups
+    }
+
+@app.get("/api/templates")
+async def get_templates():
+    """List email templates available to campaigns"""
+    await sync_shared_state()
+    names = email_service.templates.names()
+    return {
+        "total": len(names),
+        "templates": names
+    }
+
+@app.post("/api/templates")
+def create_template(template: EmailTemplate):
+    """Register (or replace) a custom email template for all campaigns"""
+    database.save_template(template.name, template.html_body, template.subject)
+    email_service.register_template(template.name, template.html_body, template.subject)
+    return {
+        "status": "success",
+        "template": template.name,
+        "fields": email_service.templates.body(template.name).fields
+    }
+
+@app.get("/api/email/pool")
+def get_email_pool():
+    """Get SMTP connection pool usage and per-connection throughput"""
+    return email_service.pool_stats()
+
+@app.get("/metrics")
+def get_metrics():
+    """Latency histograms, SMTP phase timings and queue depths in Prometheus text format"""
+    return PlainTextResponse(metrics_registry.render(), media_type=metrics_registry.content_type)
+
+def require_profiler():
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler is disabled; set PROFILER_ENABLED=1")
+
+@app.post("/debug/profiler/start")
+def start_profiler(interval: Optional[float] = None):
+    """Start sampling every thread's stack (restarts the sample counts)"""
+    require_profiler()
+    profiler.start(interval)
+    return profiler.stats()
+
+@app.post("/debug/profiler/stop")
+def stop_profiler():
+    require_profiler()
+    profiler.stop()
+    return profiler.stats()
+
+@app.get("/debug/profiler")
+def get_profiler(format: str = "json"):
+    """Sampling results: hottest functions as JSON, or collapsed stacks for flame graphs"""
+    require_profiler()
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed())
+    return profiler.stats()
+
+campaign_watch: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def resume_campaigns():
+    # Pick up campaigns a previous process was sending when it stopped (with
+    # several workers the parent already recovered their sends), then keep
+    # taking over the campaigns of any worker that dies
+    global campaign_watch
+    await campaign_jobs.resume(recover=not SHARED_STATE)
+    campaign_watch = asyncio.create_task(campaign_jobs.watch())
+
+@app.on_event("shutdown")
+def close_email_service():
+    if campaign_watch is not None:
+        campaign_watch.cancel()
+    profiler.stop()
+    email_service.close()
+    database.close()
+
+def preload():
+    """Parent, before forking workers: finish every shared load and close the database"""
+    lead_engine.preload()
+    database.recover_sends()
+    database.close()
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if WORKERS > 1:
+        serve(app, "0.0.0.0", 8000, WORKERS, before_fork=preload)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
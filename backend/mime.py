@@ -0,0 +1,159 @@
+import base64
+import random
+import time
+from email.header import Header
+from email.utils import formatdate
+from typing import List, Optional, Tuple
+
+from metrics import registry
+from templates import CompiledTemplate
+
+TEMPLATE_RENDER_DURATION = registry.histogram(
+    "template_render_duration_seconds",
+    "Time to render a template and encode the complete message for one envelope"
+)
+
+CRLF = b"\r\n"
+# RFC 5321 limit on the length of a message line
+MAX_LINE = 998
+
+
+def _crlf(text: str) -> str:
+    return text.replace("\r\n", "\n").replace("\n", "\r\n")
+
+
+def _header_value(value: str) -> bytes:
+    """A header value as wire bytes: RFC 2047-encoded when not plain ASCII"""
+    value = " ".join(value.splitlines())
+    if value.isascii() and len(value) < MAX_LINE - 80:
+        return value.encode("ascii")
+    return Header(value, "utf-8").encode(linesep="\r\n").encode("ascii")
+
+
+class MessageBuilder:
+    """
+    Builds the wire bytes of one campaign's messages without the
+    ``email`` package.
+
+    The output has the same structure as the ``MIMEMultipart`` /
+    ``MIMEText`` message ``send_email`` creates. Everything shared by the
+    campaign is encoded once: the multipart headers, the boundary, the
+    From header, and the body template's literal text as CRLF-terminated
+    ASCII. Each message then only encodes the recipient's fields and
+    joins byte strings. Bodies that need more than 7-bit ASCII (or carry
+    over-long lines) are sent as base64 UTF-8, like ``MIMEText`` does.
+    """
+
+    def __init__(self, from_email: str, subject: CompiledTemplate, body: CompiledTemplate):
+        self.subject = subject
+        self.body = body
+        boundary = "===============%019d==" % random.randrange(10 ** 19)
+        delimiter = f"--{boundary}".encode("ascii")
+
+        self._head = b"".join([
+            b'Content-Type: multipart/alternative;\r\n boundary="', boundary.encode("ascii"), b'"\r\n',
+            b"MIME-Version: 1.0\r\n",
+        ])
+        self._from = b"From: " + _header_value(from_email) + CRLF
+        self._ascii_part = delimiter + CRLF + (
+            b'Content-Type: text/html; charset="us-ascii"\r\n'
+            b"MIME-Version: 1.0\r\n"
+            b"Content-Transfer-Encoding: 7bit\r\n\r\n"
+        )
+        self._utf8_part = delimiter + CRLF + (
+            b'Content-Type: text/html; charset="utf-8"\r\n'
+            b"MIME-Version: 1.0\r\n"
+            b"Content-Transfer-Encoding: base64\r\n\r\n"
+        )
+        self._tail = CRLF + delimiter + b"--" + CRLF
+
+        # Pre-encoded body skeleton, or None when the literal text itself
+        # rules out 7-bit (non-ASCII or over-long lines)
+        literals = [_crlf(chunk) for chunk in body.literals]
+        text = "".join(literals)
+        self._lines = self._field_lines(literals)
+        if text.isascii() and all(len(line) <= MAX_LINE for line in text.split("\r\n")):
+            # Literal chunks at even indexes; field values go in the odd slots
+            self._skeleton: Optional[List[bytes]] = [b""] * (2 * len(literals) - 1)
+            self._skeleton[::2] = [chunk.encode("ascii") for chunk in literals]
+        else:
+            self._skeleton = None
+
+        self._date_second = None
+        self._date = b""
+
+    @staticmethod
+    def _field_lines(literals: List[str]) -> List[Tuple[int, List[int]]]:
+        """
+        For each body line holding fields: the length of its literal text
+        and the indexes of its fields, so the rendered line's length can
+        be checked against MAX_LINE.
+        """
+        lines = []
+        length, fields = 0, []
+        for index, chunk in enumerate(literals):
+            segments = chunk.split("\r\n")
+            length += len(segments[0])
+            if len(segments) > 1:
+                if fields:
+                    lines.append((length, fields))
+                length, fields = len(segments[-1]), []
+            if index < len(literals) - 1:
+                fields.append(index)
+        if fields:
+            lines.append((length, fields))
+        return lines
+
+    def _date_header(self) -> bytes:
+        second = int(time.time())
+        if second != self._date_second:
+            self._date = b"Date: " + formatdate(second, localtime=True).encode("ascii") + CRLF
+            self._date_second = second
+        return self._date
+
+    def _body(self, lead: dict) -> bytes:
+        values = self.body.values(lead)
+        if self._skeleton is not None:
+            joined = "".join(values)
+            if joined.isascii() and "\r" not in joined and "\n" not in joined \
+                    and all(length + sum(len(values[i]) for i in fields) <= MAX_LINE
+                            for length, fields in self._lines):
+                parts = self._skeleton.copy()
+                parts[1::2] = [value.encode("ascii") for value in values]
+                return self._ascii_part + b"".join(parts)
+
+        parts = [""] * (2 * len(values) + 1)
+        parts[::2] = self.body.literals
+        parts[1::2] = values
+        encoded = base64.encodebytes("".join(parts).encode("utf-8"))
+        return self._utf8_part + encoded.replace(b"\n", CRLF)
+
+    @property
+    def is_static(self) -> bool:
+        """True when subject and body are the same for every recipient"""
+        return self.subject.is_static and self.body.is_static
+
+    def build_shared(self) -> Tuple[str, bytes]:
+        """
+        One message for a whole multi-recipient envelope of a static
+        template; the To header names no one, as for Bcc-style sends.
+        """
+        return self.build("undisclosed-recipients:;", {})
+
+    def build(self, to_email: str, lead: dict) -> Tuple[str, bytes]:
+        """The rendered subject and the complete message for one recipient"""
+        started = time.perf_counter()
+        subject = self.subject.render(lead)
+        body = self._body(lead)
+        message = b"".join([
+            self._head,
+            b"Subject: ", _header_value(subject), CRLF,
+            self._from,
+            b"To: ", _header_value(to_email), CRLF,
+            self._date_header(),
+            CRLF,
+            body,
+            self._tail
+        ])
+        TEMPLATE_RENDER_DURATION.observe(time.perf_counter() - started)
+        return subject, message
@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class LeadFilter(BaseModel):
+    industry: str
+    location: str
+    limit: int = Field(50, ge=1)
+    verified_only: bool = False
+    min_rating: Optional[float] = None
+    min_reviews: Optional[int] = None
+    rank: bool = False
+
+
+class Lead(BaseModel):
+    id: str
+    business_name: str
+    owner_name: str
+    phone: str
+    email: str
+    address: str
+    city: str
+    state: str
+    zip_code: str
+    rating: float
+    reviews: int
+    website: Optional[str]
+    verified: bool
+    industry: str = "Roofing Contractors"
+
+
+class EmailCampaign(BaseModel):
+    campaign_name: str
+    template: str
+    lead_ids: List[str]
+
+
+class EmailTemplate(BaseModel):
+    name: str
+    subject: str
+    html_body: str
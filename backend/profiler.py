@@ -0,0 +1,115 @@
+"""
+Sampling profiler that can be switched on inside a running server.
+
+A daemon thread wakes every ``interval`` seconds, snapshots the stack
+of every other thread with ``sys._current_frames`` and counts each
+distinct stack. Output is in the collapsed-stack format that
+flamegraph.pl and speedscope read, so no external tool has to attach
+to the process. Sampling costs the profiled threads only the GIL
+hand-off; a 5 ms interval keeps overhead to a few percent.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+# Innermost frames of threads that are parked: idle executor workers,
+# condition waits and the event loop's select. Their samples are
+# dropped unless the profiler is created with ``include_idle=True``.
+IDLE_FRAMES = frozenset({
+    "thread.py:_worker", "threading.py:wait", "queue.py:get", "selectors.py:select"
+})
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005, max_depth: int = 64, include_idle: bool = False):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = None, reset: bool = True):
+        """Start sampling; a no-op if already running"""
+        if self.running:
+            return
+        if interval is not None:
+            self.interval = interval
+        if reset:
+            with self._lock:
+                self.stacks.clear()
+                self.samples = 0
+        self.started_at = time.monotonic()
+        self.stopped_at = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.stopped_at = time.monotonic()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if not self.include_idle and _frame_label(frame) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                with self._lock:
+                    self.stacks[";".join(reversed(stack))] += 1
+            with self._lock:
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        """One ``frame;frame;frame count`` line per distinct stack, hottest first"""
+        with self._lock:
+            stacks = self.stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def top(self, limit: int = 20) -> list:
+        """Functions by self samples (the innermost frame of each stack)"""
+        leaves = Counter()
+        with self._lock:
+            for stack, count in self.stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {"function": function, "samples": count, "percent": round(100 * count / total, 2)}
+            for function, count in leaves.most_common(limit)
+        ]
+
+    def stats(self) -> dict:
+        end = self.stopped_at or time.monotonic()
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks),
+            "duration_seconds": round(end - self.started_at, 3) if self.started_at else 0.0,
+            "top": self.top()
+        }
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import random
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional
+
+from dispatcher import TokenBucket
+from models import Lead, LeadFilter
+
+
+class SourceError(Exception):
+    """A fetch failed; ``retryable`` says whether trying again may help"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class SourceAdapter:
+    """
+    One upstream lead source (Google Maps, Apify, ...).
+
+    Subclasses split a search into independent page requests with
+    ``plan`` and fetch one of them with ``fetch``. The pipeline applies
+    ``max_concurrency`` and ``rate`` (requests/sec, 0 = unlimited) per
+    source, so a slow or strict upstream cannot starve the others.
+    """
+
+    name = "source"
+    max_concurrency = 4
+    rate = 0.0
+
+    def plan(self, filters: LeadFilter) -> Iterable:
+        raise NotImplementedError
+
+    async def fetch(self, request) -> List[Lead]:
+        raise NotImplementedError
+
+
+class HTTPJSONSource(SourceAdapter):
+    """
+    Pages through ``GET {base_url}?industry=..&location=..&page=N``
+    endpoints returning ``{"leads": [...]}``, using urllib in a worker
+    thread so no extra HTTP client dependency is needed.
+    """
+
+    def __init__(self, base_url: str, name: str = "http", page_size: int = 50,
+                 max_concurrency: int = 4, rate: float = 0.0, timeout: float = 10.0):
+        self.base_url = base_url
+        self.name = name
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.timeout = timeout
+
+    def plan(self, filters: LeadFilter) -> Iterable:
+        pages = -(-filters.limit // self.page_size)
+        for page in range(pages):
+            yield {
+                "industry": filters.industry,
+                "location": filters.location,
+                "page": page,
+                "page_size": self.page_size
+            }
+
+    def _get(self, params: dict) -> dict:
+        url = f"{self.base_url}?{urllib.parse.urlencode(params)}"
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            raise SourceError(f"{self.name}: HTTP {e.code}", retryable=e.code == 429 or e.code >= 500)
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise SourceError(f"{self.name}: {e}")
+
+    async def fetch(self, request) -> List[Lead]:
+        payload = await asyncio.to_thread(self._get, request)
+        try:
+            return [Lead(**item) for item in payload.get("leads", [])]
+        except (AttributeError, TypeError, ValueError) as e:
+            # pydantic's ValidationError is a ValueError; the same page would fail again
+            raise SourceError(f"{self.name}: malformed lead data: {str(e).splitlines()[0]}", retryable=False)
+
+
+class ScrapePipeline:
+    """
+    Fetches pages from every source concurrently and streams the leads
+    into ``sink`` in batches as they arrive. ``sink`` is a coroutine
+    function awaited on the event loop, so it can update in-memory
+    indexes safely and hand only its blocking work to a thread.
+
+    Fetchers put pages on a bounded queue that a single writer drains,
+    so a slow sink applies backpressure instead of letting fetched pages
+    pile up in memory. Failed fetches are retried with exponential
+    backoff while ``SourceError.retryable`` allows it. Any other error
+    stops the scrape and cancels the remaining fetchers.
+    """
+
+    def __init__(self, sources: List[SourceAdapter], sink: Callable[[List[Lead]], Awaitable[int]],
+                 max_retries: int = 3, backoff_base: float = 0.5,
+                 queue_size: int = 16, batch_size: int = 500):
+        self.sources = sources
+        self.sink = sink
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+
+    async def _fetch_with_retry(self, source: SourceAdapter, request, stats: dict) -> List[Lead]:
+        attempt = 0
+        while True:
+            try:
+                return await source.fetch(request)
+            except SourceError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+            delay = self.backoff_base * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            attempt += 1
+            stats["retries"] += 1
+
+    async def _run_source(self, source: SourceAdapter, filters: LeadFilter,
+                          pages: asyncio.Queue, stats: dict):
+        requests = iter(source.plan(filters))
+        bucket = TokenBucket(source.rate)
+
+        # max_concurrency workers share one request iterator; a full page
+        # queue blocks them in put(), which stops further fetching
+        async def worker():
+            for request in requests:
+                await bucket.acquire()
+                try:
+                    leads = await self._fetch_with_retry(source, request, stats)
+                except SourceError as e:
+                    stats["errors"].append(str(e))
+                    continue
+                stats["pages"] += 1
+                await pages.put(leads)
+
+        try:
+            async with asyncio.TaskGroup() as tasks:
+                for _ in range(source.max_concurrency):
+                    tasks.create_task(worker())
+        except ExceptionGroup as group:
+            raise group.exceptions[0]
+
+    async def stream(self, filters: LeadFilter, stats: Optional[dict] = None) -> AsyncIterator[List[Lead]]:
+        """Yield each batch as it is handed to the sink; progress goes into ``stats``"""
+        if stats is None:
+            stats = {}
+        stats.update(pages=0, retries=0, leads=0, errors=[])
+        started = time.monotonic()
+        pages = asyncio.Queue(maxsize=self.queue_size)
+
+        async def fetch_all():
+            # A source failing unexpectedly cancels the others instead of
+            # leaving them blocked on a queue nobody drains any more
+            try:
+                async with asyncio.TaskGroup() as tasks:
+                    for source in self.sources:
+                        tasks.create_task(self._run_source(source, filters, pages, stats))
+            except ExceptionGroup as group:
+                stats["errors"].extend(str(e) for e in group.exceptions)
+            await pages.put(None)
+
+        fetcher = asyncio.create_task(fetch_all())
+        batch: List[Lead] = []
+        try:
+            while True:
+                leads = await pages.get()
+                if leads is not None:
+                    room = filters.limit - stats["leads"] - len(batch)
+                    batch.extend(leads[:room])
+                done = leads is None or stats["leads"] + len(batch) >= filters.limit
+                if batch and (done or len(batch) >= self.batch_size):
+                    await self.sink(batch)
+                    stats["leads"] += len(batch)
+                    yield batch
+                    batch = []
+                if done:
+                    break
+        finally:
+            fetcher.cancel()
+            stats["elapsed_seconds"] = round(time.monotonic() - started, 3)
+
+    async def run(self, filters: LeadFilter) -> dict:
+        """Scrape up to ``filters.limit`` leads; returns the run statistics"""
+        stats = {}
+        async for _ in self.stream(filters, stats):
+            pass
+        return stats
@@ -0,0 +1,663 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from models import Lead
+
+LEAD_COLUMNS = (
+    "id", "business_name", "owner_name", "phone", "email", "address", "city",
+    "state", "zip_code", "rating", "reviews", "website", "verified", "industry"
+)
+
+CAMPAIGN_COLUMNS = (
+    "id", "name", "template", "lead_count", "recipient_count", "status",
+    "created_at", "completed_at", "emails_sent", "emails_failed",
+    "open_rate", "response_rate", "error"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id TEXT PRIMARY KEY,
+    business_name TEXT NOT NULL,
+    owner_name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    email TEXT NOT NULL,
+    address TEXT NOT NULL,
+    city TEXT NOT NULL,
+    state TEXT NOT NULL,
+    zip_code TEXT NOT NULL,
+    rating REAL NOT NULL,
+    reviews INTEGER NOT NULL,
+    website TEXT,
+    verified INTEGER NOT NULL,
+    industry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leads_state ON leads (state);
+CREATE INDEX IF NOT EXISTS idx_leads_city ON leads (city COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_leads_verified ON leads (verified);
+CREATE INDEX IF NOT EXISTS idx_leads_rating ON leads (rating);
+
+CREATE TABLE IF NOT EXISTS campaigns (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    template TEXT NOT NULL,
+    lead_count INTEGER NOT NULL,
+    recipient_count INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    emails_sent INTEGER NOT NULL DEFAULT 0,
+    emails_failed INTEGER NOT NULL DEFAULT 0,
+    open_rate REAL NOT NULL DEFAULT 0,
+    response_rate REAL NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns (status);
+
+-- Running aggregates kept current by triggers, so dashboard stats never
+-- scan the leads table. dimension is 'all' (key ''), 'state' or 'industry'.
+CREATE TABLE IF NOT EXISTS lead_aggregates (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    verified INTEGER NOT NULL DEFAULT 0,
+    rating_sum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS campaign_status_counts (
+    status TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- Durable per-recipient send queue. state goes pending -> sending ->
+-- sent | failed; a send claimed before a crash becomes 'unknown' and is
+-- never retried automatically. idempotency_key makes enqueueing the
+-- same lead for a campaign twice a no-op.
+CREATE TABLE IF NOT EXISTS send_queue (
+    campaign_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    code INTEGER,
+    error TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (campaign_id, seq)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_send_queue_key ON send_queue (idempotency_key);
+CREATE INDEX IF NOT EXISTS idx_send_queue_state ON send_queue (campaign_id, state, seq);
+
+-- Which process (owner pid) holds a queued or running campaign, and so
+-- its claimed ('sending') rows. The owner renews heartbeat while it
+-- holds the campaign; a lease older than the TTL belongs to a process
+-- that is gone, and another one may take the campaign over.
+CREATE TABLE IF NOT EXISTS campaign_leases (
+    campaign_id TEXT PRIMARY KEY,
+    owner INTEGER NOT NULL,
+    heartbeat REAL NOT NULL
+) WITHOUT ROWID;
+
+-- Counters shared by every process using the database, for IDs that must
+-- not collide between API workers. 'campaign' starts after the highest
+-- existing CAMP-<n> ID.
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+INSERT OR IGNORE INTO sequences (name, value)
+SELECT 'campaign', COALESCE(MAX(CAST(substr(id, 6) AS INTEGER)), 0) FROM campaigns WHERE id LIKE 'CAMP-%';
+
+-- Runtime-registered email templates; version orders changes so other
+-- processes can pick up only what is new
+CREATE TABLE IF NOT EXISTS templates (
+    name TEXT PRIMARY KEY,
+    html_body TEXT NOT NULL,
+    subject TEXT,
+    version INTEGER NOT NULL
+);
+"""
+
+SEND_STATES = ("pending", "sending", "sent", "failed", "unknown")
+
+_AGGREGATE_KEYS = (("all", "''"), ("state", "{row}.state"), ("industry", "{row}.industry"))
+
+
+def _aggregate_statements(row: str, sign: str) -> str:
+    """Upserts adding (sign '+') or removing (sign '-') ``row`` from every group"""
+    return "\n".join(
+        f"INSERT INTO lead_aggregates (dimension, key, total, verified, rating_sum) "
+        f"VALUES ('{dimension}', {key.format(row=row)}, {sign}1, {sign}{row}.verified, {sign}{row}.rating) "
+        f"ON CONFLICT(dimension, key) DO UPDATE SET "
+        f"total = total + excluded.total, verified = verified + excluded.verified, "
+        f"rating_sum = rating_sum + excluded.rating_sum;"
+        for dimension, key in _AGGREGATE_KEYS
+    )
+
+
+def _status_statement(status: str, sign: str) -> str:
+    return (
+        f"INSERT INTO campaign_status_counts (status, count) VALUES ({status}, {sign}1) "
+        f"ON CONFLICT(status) DO UPDATE SET count = count + excluded.count;"
+    )
+
+
+TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS leads_aggregate_insert AFTER INSERT ON leads BEGIN
+{_aggregate_statements("NEW", "+")}
+END;
+CREATE TRIGGER IF NOT EXISTS leads_aggregate_delete AFTER DELETE ON leads BEGIN
+{_aggregate_statements("OLD", "-")}
+END;
+CREATE TRIGGER IF NOT EXISTS leads_aggregate_update
+AFTER UPDATE OF state, industry, verified, rating ON leads BEGIN
+{_aggregate_statements("OLD", "-")}
+{_aggregate_statements("NEW", "+")}
+END;
+CREATE TRIGGER IF NOT EXISTS campaigns_status_insert AFTER INSERT ON campaigns BEGIN
+{_status_statement("NEW.status", "+")}
+END;
+CREATE TRIGGER IF NOT EXISTS campaigns_status_delete AFTER DELETE ON campaigns BEGIN
+{_status_statement("OLD.status", "-")}
+END;
+CREATE TRIGGER IF NOT EXISTS campaigns_status_update AFTER UPDATE OF status ON campaigns
+WHEN OLD.status IS NOT NEW.status BEGIN
+{_status_statement("OLD.status", "-")}
+{_status_statement("NEW.status", "+")}
+END;
+"""
+
+# One-off backfill for databases created before the aggregate tables
+BACKFILL = """
+INSERT INTO lead_aggregates (dimension, key, total, verified, rating_sum)
+SELECT 'all', '', COUNT(*), COALESCE(SUM(verified), 0), COALESCE(SUM(rating), 0) FROM leads;
+INSERT INTO lead_aggregates (dimension, key, total, verified, rating_sum)
+SELECT 'state', state, COUNT(*), SUM(verified), SUM(rating) FROM leads GROUP BY state;
+INSERT INTO lead_aggregates (dimension, key, total, verified, rating_sum)
+SELECT 'industry', industry, COUNT(*), SUM(verified), SUM(rating) FROM leads GROUP BY industry;
+INSERT INTO campaign_status_counts (status, count)
+SELECT status, COUNT(*) FROM campaigns GROUP BY status;
+"""
+
+# Dedupe keys of stored leads as indexed SQL expressions, so ingest can
+# look them up instead of loading every lead: the phone's digits, the
+# lowercase email, and the lowercase website without scheme, "www." or
+# trailing slash. The _*_key functions compute the same values in Python.
+PHONE_KEY = "replace(replace(replace(replace(replace(replace(phone, '+', ''), '-', ''), ' ', ''), '(', ''), ')', ''), '.', '')"
+EMAIL_KEY = "lower(trim(email))"
+WEBSITE_KEY = "rtrim(replace(replace(replace(lower(trim(website)), 'https://', ''), 'http://', ''), 'www.', ''), '/')"
+
+KEY_INDEXES = f"""
+CREATE INDEX IF NOT EXISTS idx_leads_phone_key ON leads ({PHONE_KEY});
+CREATE INDEX IF NOT EXISTS idx_leads_email_key ON leads ({EMAIL_KEY});
+CREATE INDEX IF NOT EXISTS idx_leads_website_key ON leads ({WEBSITE_KEY});
+"""
+
+
+def _phone_key(phone: str) -> str:
+    for ch in "+- ().":
+        phone = phone.replace(ch, "")
+    return phone
+
+
+def _email_key(email: str) -> str:
+    return email.strip(" ").lower()
+
+
+def _website_key(website: str) -> str:
+    site = website.strip(" ").lower()
+    for prefix in ("https://", "http://", "www."):
+        site = site.replace(prefix, "")
+    return site.rstrip("/")
+
+
+GROUP_DIMENSIONS = ("state", "industry")
+
+_LEAD_UPSERT = (
+    f"INSERT INTO leads ({', '.join(LEAD_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in LEAD_COLUMNS)}) "
+    f"ON CONFLICT(id) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in LEAD_COLUMNS[1:])
+)
+
+_CAMPAIGN_UPSERT = (
+    f"INSERT INTO campaigns ({', '.join(CAMPAIGN_COLUMNS)}) "
+    f"VALUES ({', '.join(':' + column for column in CAMPAIGN_COLUMNS)}) "
+    f"ON CONFLICT(id) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in CAMPAIGN_COLUMNS[1:])
+)
+
+def lead_row(lead) -> tuple:
+    return (
+        lead.id, lead.business_name, lead.owner_name, lead.phone, lead.email,
+        lead.address, lead.city, lead.state, lead.zip_code, lead.rating,
+        lead.reviews, lead.website, int(lead.verified), lead.industry
+    )
+
+
+def row_to_lead(row: sqlite3.Row) -> Lead:
+    data = dict(row)
+    data["verified"] = bool(data["verified"])
+    return Lead(**data)
+
+
+class Database:
+    """
+    SQLite store of record for leads and campaigns.
+
+    Runs in WAL mode so API readers never block the writer, and hands
+    each thread its own connection (FastAPI runs sync endpoints in a
+    thread pool). ``bulk_insert_leads`` streams rows through
+    ``executemany`` in large transactions for fast ingest.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # A forked worker must open its own connections, never reuse the parent's
+        # (there is no fork, and so no hook, on Windows)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+        with self._write_lock:
+            conn = self.conn
+            conn.executescript(SCHEMA + KEY_INDEXES)
+            if conn.execute("SELECT 1 FROM lead_aggregates LIMIT 1").fetchone() is None:
+                conn.executescript("BEGIN;" + BACKFILL + TRIGGERS + "COMMIT;")
+            else:
+                conn.executescript(TRIGGERS)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Serialize writers within this process and commit atomically"""
+        with self._write_lock:
+            conn = self.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _reset_after_fork(self):
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def next_sequence(self, name: str) -> int:
+        """Next value of a named counter, unique across every process sharing the file"""
+        with self.transaction() as conn:
+            return conn.execute(
+                "INSERT INTO sequences (name, value) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + 1 RETURNING value",
+                (name,)
+            ).fetchone()[0]
+
+    # Leads
+
+    def bulk_insert_leads(self, leads: Iterable, batch_size: int = 50000) -> int:
+        """Upsert leads in batched transactions; returns the number written"""
+        return self.bulk_insert_rows(map(lead_row, leads), batch_size)
+
+    def bulk_insert_rows(self, rows: Iterable[tuple], batch_size: int = 50000) -> int:
+        """Upsert raw row tuples in ``LEAD_COLUMNS`` order, skipping model construction"""
+        rows = iter(rows)
+        written = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return written
+            with self.transaction() as conn:
+                conn.executemany(_LEAD_UPSERT, batch)
+            written += len(batch)
+
+    def count_leads(self, verified_only: bool = False) -> int:
+        if verified_only:
+            sql = "SELECT COUNT(*) FROM leads WHERE verified = 1"
+        else:
+            sql = "SELECT COUNT(*) FROM leads"
+        return self.conn.execute(sql).fetchone()[0]
+
+    def page_leads(self, limit: int, after: int = 0, verified_only: bool = False) -> Tuple[List[Lead], Optional[int]]:
+        """
+        One keyset page of leads in table order, starting after rowid
+        ``after``. Returns the page and the cursor for the next one (None
+        on the last page); only ``limit`` + 1 rows are ever read.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        where = "verified = 1 AND " if verified_only else ""
+        rows = self.conn.execute(
+            f"SELECT rowid AS seq, * FROM leads WHERE {where}rowid > ? ORDER BY rowid LIMIT ?",
+            (after, limit + 1)
+        ).fetchall()
+        next_cursor = rows[limit - 1]["seq"] if len(rows) > limit else None
+        return [row_to_lead(row) for row in rows[:limit]], next_cursor
+
+    def max_lead_rowid(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM leads").fetchone()[0]
+
+    def leads_after(self, rowid: int, limit: int = 10000) -> Tuple[List[Lead], int]:
+        """Up to ``limit`` leads inserted after ``rowid``, and the rowid to pass next time"""
+        rows = self.conn.execute(
+            "SELECT rowid AS seq, * FROM leads WHERE rowid > ? ORDER BY rowid LIMIT ?", (rowid, limit)
+        ).fetchall()
+        if not rows:
+            return [], rowid
+        last = rows[-1]["seq"]
+        return [row_to_lead(row) for row in rows], last
+
+    def duplicate_key(self, lead_id: str, phone: Optional[str], email: Optional[str],
+                      website: Optional[str], city: str) -> Optional[str]:
+        """
+        'phone', 'email' or 'website' if the first stored lead with that
+        key is not ``lead_id``; email and website only count within
+        ``city``. Keys are as ``dedupe`` normalizes them; a US phone also
+        matches its stored 10-digit form.
+        """
+        conn = self.conn
+        if phone:
+            key = _phone_key(phone)
+            short = key[1:] if len(key) == 11 and key[0] == "1" else key
+            row = conn.execute(
+                f"SELECT id FROM leads WHERE {PHONE_KEY} IN (?, ?) ORDER BY rowid LIMIT 1", (key, short)
+            ).fetchone()
+            if row is not None and row[0] != lead_id:
+                return "phone"
+        for reason, expression, value in (("email", EMAIL_KEY, email and _email_key(email)),
+                                          ("website", WEBSITE_KEY, website and _website_key(website))):
+            if not value:
+                continue
+            row = conn.execute(
+                f"SELECT id FROM leads WHERE {expression} = ? AND city = ? COLLATE NOCASE ORDER BY rowid LIMIT 1",
+                (value, city)
+            ).fetchone()
+            if row is not None and row[0] != lead_id:
+                return reason
+        return None
+
+    def city_names(self, city: str) -> List[Tuple[str, str]]:
+        """(id, business_name) of every stored lead in ``city``"""
+        rows = self.conn.execute(
+            "SELECT id, business_name FROM leads WHERE city = ? COLLATE NOCASE ORDER BY rowid", (city,)
+        )
+        return [tuple(row) for row in rows]
+
+    def iter_leads(self, batch_size: int = 10000) -> Iterator[Lead]:
+        for row in self.iter_lead_rows(batch_size=batch_size):
+            yield row_to_lead(row)
+
+    def iter_lead_rows(self, verified_only: bool = False, batch_size: int = 10000) -> Iterator[dict]:
+        """
+        Stream raw lead rows as dicts on a dedicated connection, so a
+        long export neither holds a thread's shared connection nor builds
+        ``Lead`` models it would immediately serialize again.
+        """
+        where = "WHERE verified = 1 " if verified_only else ""
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(LEAD_COLUMNS)} FROM leads {where}ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    lead = dict(zip(LEAD_COLUMNS, row))
+                    lead["verified"] = bool(lead["verified"])
+                    yield lead
+        finally:
+            conn.close()
+
+    def lead_stats(self) -> dict:
+        """Totals from the trigger-maintained aggregates; independent of table size"""
+        row = self.conn.execute(
+            "SELECT total, verified, rating_sum FROM lead_aggregates WHERE dimension = 'all'"
+        ).fetchone()
+        total, verified, rating_sum = row if row else (0, 0, 0.0)
+        states = self.conn.execute(
+            "SELECT COUNT(*) FROM lead_aggregates WHERE dimension = 'state' AND total > 0"
+        ).fetchone()[0]
+        return {
+            "total": total,
+            "verified": verified,
+            "avg_rating": rating_sum / total if total else None,
+            "states": states
+        }
+
+    def grouped_lead_stats(self, dimension: str) -> List[dict]:
+        """Per-state or per-industry totals, read from the running aggregates"""
+        if dimension not in GROUP_DIMENSIONS:
+            raise ValueError(f"Unknown stats dimension: {dimension}")
+        rows = self.conn.execute(
+            "SELECT key, total, verified, rating_sum FROM lead_aggregates "
+            "WHERE dimension = ? AND total > 0 ORDER BY total DESC, key",
+            (dimension,)
+        )
+        return [{
+            dimension: key,
+            "total_leads": total,
+            "verified_leads": verified,
+            "avg_rating": round(rating_sum / total, 2)
+        } for key, total, verified, rating_sum in rows]
+
+    # Campaigns
+
+    def count_campaigns(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM campaigns").fetchone()[0]
+
+    def save_campaign(self, campaign: dict):
+        values = {column: campaign.get(column) for column in CAMPAIGN_COLUMNS}
+        with self.transaction() as conn:
+            conn.execute(_CAMPAIGN_UPSERT, values)
+
+    def get_campaign(self, campaign_id: str) -> Optional[dict]:
+        row = self.conn.execute("SELECT * FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
+        return None if row is None else {k: v for k, v in dict(row).items() if v is not None}
+
+    def list_campaigns(self) -> List[dict]:
+        rows = self.conn.execute("SELECT * FROM campaigns ORDER BY rowid")
+        return [{k: v for k, v in dict(row).items() if v is not None} for row in rows]
+
+    def campaign_status_counts(self) -> dict:
+        rows = self.conn.execute("SELECT status, count FROM campaign_status_counts WHERE count > 0")
+        return {status: count for status, count in rows}
+
+    def orphaned_campaigns(self, ttl: float) -> List[dict]:
+        """Queued or running campaigns with no lease renewed in the last ``ttl`` seconds"""
+        rows = self.conn.execute(
+            "SELECT c.* FROM campaigns c LEFT JOIN campaign_leases l ON l.campaign_id = c.id "
+            "WHERE c.status IN ('queued', 'running') AND (l.heartbeat IS NULL OR l.heartbeat < ?) "
+            "ORDER BY c.rowid",
+            (time.time() - ttl,)
+        )
+        return [dict(row) for row in rows]
+
+    # Campaign leases
+
+    def acquire_lease(self, campaign_id: str, owner: int, ttl: float) -> bool:
+        """
+        Make ``owner`` the holder of a campaign unless another process
+        renewed its lease within ``ttl`` seconds. Sends the previous
+        holder claimed but never recorded are marked 'unknown' in the
+        same transaction. Returns whether the lease was taken.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT heartbeat FROM campaign_leases WHERE campaign_id = ?", (campaign_id,)
+            ).fetchone()
+            if row is not None and row["heartbeat"] >= now - ttl:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO campaign_leases (campaign_id, owner, heartbeat) VALUES (?, ?, ?)",
+                (campaign_id, owner, now)
+            )
+            conn.execute(
+                "UPDATE send_queue SET state = 'unknown', error = 'interrupted before delivery was recorded' "
+                "WHERE campaign_id = ? AND state = 'sending'",
+                (campaign_id,)
+            )
+        return True
+
+    def renew_leases(self, owner: int, campaign_ids: Iterable[str]) -> List[str]:
+        """Refresh ``owner``'s leases on these campaigns; returns the ones it still holds"""
+        now = time.time()
+        held = []
+        with self.transaction() as conn:
+            for campaign_id in campaign_ids:
+                if conn.execute(
+                    "UPDATE campaign_leases SET heartbeat = ? WHERE campaign_id = ? AND owner = ?",
+                    (now, campaign_id, owner)
+                ).rowcount:
+                    held.append(campaign_id)
+        return held
+
+    def release_lease(self, campaign_id: str, owner: int):
+        with self.transaction() as conn:
+            conn.execute(
+                "DELETE FROM campaign_leases WHERE campaign_id = ? AND owner = ?", (campaign_id, owner)
+            )
+
+    # Templates
+
+    def save_template(self, name: str, html_body: str, subject: Optional[str] = None):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO templates (name, html_body, subject, version) "
+                "VALUES (?, ?, ?, (SELECT COALESCE(MAX(version), 0) + 1 FROM templates)) "
+                "ON CONFLICT(name) DO UPDATE SET html_body = excluded.html_body, "
+                "subject = excluded.subject, version = excluded.version",
+                (name, html_body, subject)
+            )
+
+    def templates_after(self, version: int = 0) -> List[dict]:
+        """Templates saved or changed after ``version``, oldest change first"""
+        rows = self.conn.execute(
+            "SELECT name, html_body, subject, version FROM templates WHERE version > ? ORDER BY version",
+            (version,)
+        )
+        return [dict(row) for row in rows]
+
+    # Send queue
+
+    def enqueue_sends(self, campaign_id: str, recipients: Iterable[dict], batch_size: int = 10000) -> int:
+        """
+        Append recipients to a campaign's send queue in batched
+        transactions. Recipients already queued for the campaign (same
+        ``lead_id``) are skipped; returns the number actually added.
+        Leads that share an email address are each queued.
+        """
+        def rows():
+            for seq, recipient in enumerate(recipients):
+                lead_id = recipient.get("lead_id")
+                key = f"{campaign_id}:{lead_id}" if lead_id is not None else f"{campaign_id}:#{seq}"
+                yield campaign_id, seq, key, json.dumps(recipient)
+
+        rows = rows()
+        added = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return added
+            with self.transaction() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO send_queue (campaign_id, seq, idempotency_key, recipient) "
+                    "VALUES (?, ?, ?, ?)",
+                    batch
+                )
+                added += conn.total_changes - before
+
+    def claim_sends(self, campaign_id: str, limit: int) -> List[Tuple[int, dict]]:
+        """Mark the next ``limit`` pending recipients as sending and return them in order"""
+        with self.transaction() as conn:
+            rows = conn.execute(
+                "SELECT seq, recipient FROM send_queue "
+                "WHERE campaign_id = ? AND state = 'pending' ORDER BY seq LIMIT ?",
+                (campaign_id, limit)
+            ).fetchall()
+            if rows:
+                conn.execute(
+                    "UPDATE send_queue SET state = 'sending' "
+                    "WHERE campaign_id = ? AND state = 'pending' AND seq <= ?",
+                    (campaign_id, rows[-1]["seq"])
+                )
+        return [(row["seq"], json.loads(row["recipient"])) for row in rows]
+
+    def record_sends(self, campaign_id: str, results: Iterable[Tuple[int, dict]]):
+        """Store the outcome of claimed sends in one transaction"""
+        rows = [(
+            "sent" if result["status"] == "sent" else "failed",
+            result.get("attempts", 1),
+            result.get("code"),
+            result.get("error"),
+            result.get("timestamp"),
+            campaign_id,
+            seq
+        ) for seq, result in results]
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE send_queue SET state = ?, attempts = ?, code = ?, error = ?, updated_at = ? "
+                "WHERE campaign_id = ? AND seq = ?",
+                rows
+            )
+
+    def abandon_sends(self, campaign_id: str) -> int:
+        """
+        Mark a campaign's claimed but unrecorded sends 'unknown', for a
+        sender that stopped without learning their outcome; returns how
+        many there were.
+        """
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE send_queue SET state = 'unknown', error = 'interrupted before delivery was recorded' "
+                "WHERE campaign_id = ? AND state = 'sending'",
+                (campaign_id,)
+            ).rowcount
+
+    def recover_sends(self) -> int:
+        """
+        After a restart, mark sends that were claimed but never recorded
+        as 'unknown'; they may or may not have gone out, so they are not
+        resent. Every campaign lease is dropped too. Only safe while no
+        other process is sending; returns how many sends there were.
+        """
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM campaign_leases")
+            return conn.execute(
+                "UPDATE send_queue SET state = 'unknown', error = 'interrupted before delivery was recorded' "
+                "WHERE state = 'sending'"
+            ).rowcount
+
+    def send_queue_counts(self, campaign_id: str) -> dict:
+        rows = self.conn.execute(
+            "SELECT state, COUNT(*) FROM send_queue WHERE campaign_id = ? GROUP BY state",
+            (campaign_id,)
+        )
+        counts = dict.fromkeys(SEND_STATES, 0)
+        counts.update(rows)
+        return counts
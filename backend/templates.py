@@ -0,0 +1,185 @@
+import html
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# ``{field}`` or ``{field|default}`` placeholders
+PLACEHOLDER = re.compile(r"\{(\w+)(?:\|([^{}]*))?\}")
+
+
+class CompiledTemplate:
+    """
+    A template split once into literal chunks and lead fields, so rendering
+    is a single ``str.join`` over pre-built parts instead of re-parsing.
+    """
+
+    __slots__ = ("source", "_parts", "_fields", "escape")
+
+    def __init__(self, source: str, escape: bool = False):
+        self.source = source
+        self.escape = escape
+        self._parts: List[str] = []
+        self._fields: List[Tuple[int, str, Optional[str]]] = []
+
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            self._parts.append(source[position:match.start()])
+            self._fields.append((len(self._parts), match.group(1), match.group(2)))
+            self._parts.append("")
+            position = match.end()
+        self._parts.append(source[position:])
+
+    @property
+    def fields(self) -> List[str]:
+        return [name for _, name, _ in self._fields]
+
+    @property
+    def is_static(self) -> bool:
+        """True when the output does not depend on the lead at all"""
+        return not self._fields
+
+    @property
+    def literals(self) -> List[str]:
+        """The text around the fields; fields go between consecutive chunks"""
+        return self._parts[::2]
+
+    def values(self, lead: dict) -> List[str]:
+        """Rendered field values, in template order"""
+        values = []
+        for _, name, default in self._fields:
+            value = lead.get(name)
+            if value is None:
+                value = default if default is not None else "None"
+            value = str(value)
+            values.append(html.escape(value) if self.escape else value)
+        return values
+
+    def render(self, lead: dict) -> str:
+        if not self._fields:
+            return self._parts[0]
+        parts = self._parts.copy()
+        parts[1::2] = self.values(lead)
+        return "".join(parts)
+
+
+class TemplateRegistry:
+    """
+    Compiled subject/body templates shared across campaigns. Built-in
+    templates are registered at import; user templates can be added or
+    replaced at runtime with ``register``. Looking up a body that is not
+    registered raises ``KeyError``; a template without its own subject
+    uses ``fallback_subject``.
+    """
+
+    def __init__(self, fallback_subject: str = "Reaching out"):
+        self._fallback_subject = CompiledTemplate(fallback_subject)
+        self._bodies: Dict[str, CompiledTemplate] = {}
+        self._subjects: Dict[str, CompiledTemplate] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, body: str, subject: Optional[str] = None, escape: bool = False):
+        body_template = CompiledTemplate(body, escape=escape)
+        subject_template = CompiledTemplate(subject) if subject is not None else None
+        with self._lock:
+            self._bodies[name] = body_template
+            if subject_template is not None:
+                self._subjects[name] = subject_template
+            else:
+                self._subjects.pop(name, None)
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._bodies.pop(name, None)
+            self._subjects.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self._bodies)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._bodies
+
+    def body(self, name: str) -> CompiledTemplate:
+        try:
+            return self._bodies[name]
+        except KeyError:
+            raise KeyError(f"Unknown template: {name}") from None
+
+    def subject(self, name: str) -> CompiledTemplate:
+        return self._subjects.get(name, self._fallback_subject)
+
+    def render_body(self, name: str, lead: dict) -> str:
+        return self.body(name).render(lead)
+
+    def render_subject(self, name: str, lead: dict) -> str:
+        return self.subject(name).render(lead)
+
+
+BUILTIN_TEMPLATES = {
+    "intro": ("Quick question about {business_name}", """
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <h2 style="color: #6366f1;">Hello {owner_name|there}!</h2>
+                    <p>I noticed your business, <strong>{business_name}</strong>, and wanted to reach out.</p>
+                    <p>We specialize in providing cutting-edge solutions for roofing contractors like yourself.</p>
+                    <p>Would you be interested in a quick 15-minute call to discuss how we can help grow your business?</p>
+                    <br>
+                    <p>Best regards,<br>Your Name<br>Company Name</p>
+                    <hr style="border: 1px solid #eee; margin: 20px 0;">
+                    <p style="font-size: 12px; color: #888;">
+                        You received this email because your business is listed on Google Maps.
+                        <a href="#">Unsubscribe</a>
+                    </p>
+                </body>
+                </html>
+            """),
+    "partnership": ("Partnership opportunity in {city}", """
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <h2 style="color: #6366f1;">Partnership Opportunity for {business_name}</h2>
+                    <p>Hi {owner_name},</p>
+                    <p>We're looking for top-rated roofing contractors to partner with in {city}, {state}.</p>
+                    <p>Your {rating|5.0}⭐ rating caught our attention!</p>
+                    <p><strong>What we offer:</strong></p>
+                    <ul>
+                        <li>Exclusive lead generation</li>
+                        <li>Marketing support</li>
+                        <li>Technology solutions</li>
+                    </ul>
+                    <p>Interested? Let's schedule a call.</p>
+                    <br>
+                    <p>Best regards,<br>Partnership Team</p>
+                </body>
+                </html>
+            """),
+    "demo": ("Free demo - 40% efficiency boost for your roofing business", """
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <h2 style="color: #6366f1;">Free Demo for {business_name}</h2>
+                    <p>Hi {owner_name},</p>
+                    <p>We have a powerful tool that's helping roofing contractors increase efficiency by 40%.</p>
+                    <p>I'd love to show you a quick demo - no commitment required.</p>
+                    <p><a href="#" style="background: #6366f1; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px; display: inline-block;">Book Your Demo</a></p>
+                    <br>
+                    <p>Looking forward to connecting,<br>Sales Team</p>
+                </body>
+                </html>
+            """),
+    "followup": ("Following up on our conversation", """
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <h2 style="color: #6366f1;">Following Up</h2>
+                    <p>Hi {owner_name},</p>
+                    <p>I wanted to follow up on my previous message about helping {business_name} grow.</p>
+                    <p>Quick question: What's your biggest challenge right now in growing your roofing business?</p>
+                    <p>Happy to share some insights that might help.</p>
+                    <br>
+                    <p>Best,<br>Your Name</p>
+                </body>
+                </html>
+            """),
+}
+
+# Shared by every EmailService instance and campaign
+registry = TemplateRegistry()
+for _name, (_subject, _body) in BUILTIN_TEMPLATES.items():
+    registry.register(_name, _body, _subject)
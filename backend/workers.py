@@ -0,0 +1,88 @@
+"""
+Pre-fork supervisor for serving the API from several processes.
+
+uvicorn's own ``--workers`` spawns fresh interpreters, so every worker
+imports the app and builds its own lead index. ``serve`` binds the
+listening socket, lets the caller finish loading in the parent, then
+forks the workers: the lead table, its indexes and the NumPy columns
+are shared copy-on-write instead of being rebuilt once per worker.
+Workers that die are restarted; SIGTERM or SIGINT stops them all.
+"""
+import gc
+import os
+import signal
+import time
+import traceback
+from typing import Callable, Optional
+
+import uvicorn
+
+
+def serve(app, host: str, port: int, workers: int,
+          before_fork: Optional[Callable[[], None]] = None,
+          on_worker_start: Optional[Callable[[int, bool], None]] = None,
+          **uvicorn_options):
+    """
+    Run ``app`` in ``workers`` forked uvicorn processes sharing one socket
+    (POSIX only: it needs ``os.fork``).
+
+    ``before_fork`` runs once in the parent after the socket is bound;
+    it should preload shared data and close anything that must not
+    cross a fork (database connections). ``on_worker_start(index,
+    first)`` runs in each child before it serves; ``first`` is False
+    when the worker replaces one that died.
+    """
+    config = uvicorn.Config(app, host=host, port=port, **uvicorn_options)
+    sock = config.bind_socket()
+    if before_fork is not None:
+        before_fork()
+    # Keep the collector from touching, and so copying, every preloaded object
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(index: int, first: bool):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                if on_worker_start is not None:
+                    on_worker_start(index, first)
+                uvicorn.Server(config).run(sockets=[sock])
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                # Never return into the parent's code path
+                os._exit(code)
+        children[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Serving on {host}:{port} with {workers} workers (parent pid {os.getpid()})")
+    for index in range(workers):
+        spawn(index, True)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is not None and not stopping:
+            print(f"Worker {index} (pid {pid}) exited with code {os.waitstatus_to_exitcode(status)}; restarting")
+            time.sleep(0.5)
+            spawn(index, False)
+    sock.close()
@@ -183,12 +183,37 @@ document.getElementById('createCampaign').addEventListener('click', async () =>
         alert('✅ Campaign created successfully!');
         document.getElementById('campaignName').value = '';
         loadCampaigns();
+        watchCampaignProgress(data.progress_url);
     } catch (error) {
         console.error('Error creating campaign:', error);
         alert('Failed to create campaign!');
     }
 });
 
+// Follow the NDJSON progress stream and refresh the list as sends complete
+async function watchCampaignProgress(progressUrl) {
+    try {
+        const response = await fetch(`${API_BASE}${progressUrl}`);
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            if (lines.some(line => line.trim())) {
+                loadCampaigns();
+            }
+        }
+        loadCampaigns();
+    } catch (error) {
+        console.error('Error watching campaign progress:', error);
+    }
+}
+
 document.getElementById('refreshCampaigns').addEventListener('click', loadCampaigns);
 
 async function loadCampaigns() {
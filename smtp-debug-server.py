@@ -1,69 +1,193 @@
 """
 Simple email logger that prints emails to console
 Works without any external dependencies - uses only Python standard library
+
+Runs on asyncio, so one process keeps up with many concurrent SMTP
+clients: input is parsed incrementally per connection, PIPELINING and
+multiple RCPTs per message are supported, and messages can be saved to
+an mbox file or Maildir. Use --quiet for load tests; it prints received
+messages/sec instead of every email.
+
+    python smtp-debug-server.py
+    python smtp-debug-server.py --port 1025 --quiet --maildir ./mail
 """
-import socket
-import threading
-from email import message_from_bytes
-from email.policy import default
+import argparse
+import asyncio
+import mailbox
+import time
 from datetime import datetime
 
+MAX_MESSAGE_SIZE = 32 * 1024 * 1024
+MAX_LINE = 4096
+
+
+def parse_address(argument: str) -> str:
+    """'<a@b.com> SIZE=123 BODY=8BITMIME' -> '<a@b.com>'; ESMTP parameters are dropped"""
+    argument = argument.strip()
+    if argument.startswith('<'):
+        end = argument.find('>')
+        return argument[:end + 1] if end >= 0 else argument
+    return argument.split(None, 1)[0] if argument else argument
+
+
+class SMTPProtocol(asyncio.Protocol):
+    """
+    One client connection. Received bytes are appended to a buffer and
+    parsed in place: complete command lines are answered as they are
+    found and message data is located with one search for the CRLF.CRLF
+    terminator. Replies to pipelined commands go out in a single write.
+    Message data past MAX_MESSAGE_SIZE is counted but not kept, and the
+    message is refused once its terminator arrives.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.transport = None
+        self.buffer = bytearray()
+        self.in_data = False
+        self.scan_from = 0
+        self.data_dropped = 0
+        self.reset()
+
+    def reset(self):
+        self.mail_from = None
+        self.rcpt_to = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.logger.stats["connections"] += 1
+        # Send SMTP greeting
+        transport.write(b"220 localhost SMTP\r\n")
+
+    def data_received(self, data):
+        buffer = self.buffer
+        buffer += data
+        replies = []
+        closing = False
+        while not closing:
+            if self.in_data:
+                if not self.data_dropped and buffer.startswith(b".\r\n"):
+                    end, raw = 0, b""
+                else:
+                    end = buffer.find(b"\r\n.\r\n", self.scan_from)
+                    if end < 0:
+                        if len(buffer) > MAX_MESSAGE_SIZE:
+                            # Too large already: only the start of a terminator is worth keeping
+                            self.data_dropped += len(buffer) - 4
+                            del buffer[:-4]
+                        self.scan_from = max(0, len(buffer) - 4)
+                        break
+                    raw = bytes(buffer[:end + 2])
+                    end += 2
+                del buffer[:end + 3]
+                self.in_data = False
+                self.scan_from = 0
+                replies.append(self.receive_message(raw))
+                self.data_dropped = 0
+                continue
+
+            end = buffer.find(b"\r\n")
+            if end < 0:
+                if len(buffer) > MAX_LINE:
+                    replies.append(b"500 Line too long\r\n")
+                    buffer.clear()
+                break
+            line = bytes(buffer[:end])
+            del buffer[:end + 2]
+            reply = self.handle_command(line)
+            replies.append(reply)
+            closing = reply.startswith(b"221")
+
+        if replies:
+            self.transport.write(b"".join(replies))
+        if closing:
+            self.transport.close()
+
+    def handle_command(self, line: bytes) -> bytes:
+        command = line.decode('utf-8', errors='ignore')
+        verb = command[:4].upper()
+
+        if verb == 'EHLO':
+            self.reset()
+            return (b"250-localhost Hello\r\n250-PIPELINING\r\n250-8BITMIME\r\n"
+                    b"250 SIZE %d\r\n" % MAX_MESSAGE_SIZE)
+        if verb == 'HELO':
+            self.reset()
+            return b"250 Hello\r\n"
+        if command.upper().startswith('MAIL FROM:'):
+            if self.mail_from is not None:
+                return b"503 Nested MAIL command\r\n"
+            self.mail_from = parse_address(command.split(':', 1)[1])
+            return b"250 OK\r\n"
+        if command.upper().startswith('RCPT TO:'):
+            if self.mail_from is None:
+                return b"503 Need MAIL command\r\n"
+            self.rcpt_to.append(parse_address(command.split(':', 1)[1]))
+            return b"250 OK\r\n"
+        if verb == 'DATA':
+            if not self.rcpt_to:
+                return b"503 Need RCPT command\r\n"
+            self.in_data = True
+            return b"354 Send message, end with CRLF.CRLF\r\n"
+        if verb == 'RSET':
+            self.reset()
+            return b"250 OK\r\n"
+        if verb == 'NOOP':
+            return b"250 OK\r\n"
+        if verb == 'QUIT':
+            return b"221 Bye\r\n"
+        if verb == 'VRFY':
+            return b"252 Cannot VRFY user\r\n"
+        return b"502 Command not implemented\r\n"
+
+    def receive_message(self, raw: bytes) -> bytes:
+        if self.data_dropped or len(raw) > MAX_MESSAGE_SIZE:
+            self.reset()
+            return b"552 Message too large\r\n"
+        # Undo dot-stuffing
+        if raw.startswith(b".."):
+            raw = raw[1:]
+        raw = raw.replace(b"\r\n..", b"\r\n.")
+        self.logger.email_received(raw, self.mail_from, self.rcpt_to)
+        self.reset()
+        return b"250 OK\r\n"
+
+
 class SimpleEmailLogger:
-    def __init__(self, host='localhost', port=1025):
+    def __init__(self, host='localhost', port=1025, quiet=False, mbox=None, maildir=None,
+                 report_interval=5.0):
         self.host = host
         self.port = port
+        self.quiet = quiet
+        self.report_interval = report_interval
         self.running = False
-        
-    def handle_client(self, client_socket, address):
-        """Handle individual email connection"""
-        try:
-            # Send SMTP greeting
-            client_socket.send(b"220 localhost SMTP\r\n")
-            
-            data = b""
-            while True:
-                chunk = client_socket.recv(4096)
-                if not chunk:
-                    break
-                    
-                data += chunk
-                lines = data.decode('utf-8', errors='ignore').split('\r\n')
-                
-                for line in lines[:-1]:
-                    if line.upper().startswith('HELO') or line.upper().startswith('EHLO'):
-                        client_socket.send(b"250 Hello\r\n")
-                    elif line.upper().startswith('MAIL FROM:'):
-                        self.mail_from = line.split(':', 1)[1].strip()
-                        client_socket.send(b"250 OK\r\n")
-                    elif line.upper().startswith('RCPT TO:'):
-                        self.rcpt_to = line.split(':', 1)[1].strip()
-                        client_socket.send(b"250 OK\r\n")
-                    elif line.upper().startswith('DATA'):
-                        client_socket.send(b"354 Send message, end with CRLF.CRLF\r\n")
-                    elif line == '.':
-                        # Email received
-                        self.print_email(data)
-                        client_socket.send(b"250 OK\r\n")
-                    elif line.upper().startswith('QUIT'):
-                        client_socket.send(b"221 Bye\r\n")
-                        break
-                
-                data = lines[-1].encode()
-                
-        except Exception as e:
-            print(f"Error handling client: {e}")
-        finally:
-            client_socket.close()
-    
-    def print_email(self, raw_data):
+        self.mailbox = None
+        if mbox:
+            self.mailbox = mailbox.mbox(mbox)
+        elif maildir:
+            self.mailbox = mailbox.Maildir(maildir)
+        self._pending = []
+        self.stats = {"connections": 0, "messages": 0, "recipients": 0, "bytes": 0}
+        self._server = None
+
+    def email_received(self, raw_data, mail_from, rcpt_to):
+        self.stats["messages"] += 1
+        self.stats["recipients"] += len(rcpt_to)
+        self.stats["bytes"] += len(raw_data)
+        if self.mailbox is not None:
+            self._pending.append(raw_data)
+        if not self.quiet:
+            self.print_email(raw_data, mail_from, rcpt_to)
+
+    def print_email(self, raw_data, mail_from, rcpt_to):
         """Print email details"""
         print("\n" + "="*80)
         print(f"📧 EMAIL RECEIVED - {datetime.now().strftime('%H:%M:%S')}")
         print("="*80)
-        print(f"From: {getattr(self, 'mail_from', 'Unknown')}")
-        print(f"To: {getattr(self, 'rcpt_to', 'Unknown')}")
+        print(f"From: {mail_from or 'Unknown'}")
+        print(f"To: {', '.join(rcpt_to) or 'Unknown'}")
         print("-"*80)
-        
+
         # Extract subject from raw data
         data_str = raw_data.decode('utf-8', errors='ignore')
         for line in data_str.split('\n'):
@@ -74,48 +198,82 @@ class SimpleEmailLogger:
                 try:
                     business = line.split('<strong>')[1].split('</strong>')[0]
                     print(f"Business: {business}")
-                except:
+                except IndexError:
                     pass
-        
+
         print("="*80)
         print("✅ Email logged successfully!\n")
-    
+
+    def _save(self, messages):
+        self.mailbox.lock()
+        try:
+            for raw in messages:
+                self.mailbox.add(raw)
+            self.mailbox.flush()
+        finally:
+            self.mailbox.unlock()
+
+    async def _flush_mailbox(self):
+        """Write received messages to the mailbox in batches, off the event loop"""
+        while True:
+            await asyncio.sleep(0.2)
+            if self._pending:
+                messages, self._pending = self._pending, []
+                await asyncio.to_thread(self._save, messages)
+
+    async def _report(self):
+        """Print received messages/sec every report_interval seconds"""
+        last, last_time = 0, time.monotonic()
+        while True:
+            await asyncio.sleep(self.report_interval)
+            now = time.monotonic()
+            received = self.stats["messages"] - last
+            if received:
+                print(f"📈 {received / (now - last_time):,.0f} msg/s "
+                      f"({self.stats['messages']:,} messages, {self.stats['recipients']:,} recipients total)",
+                      flush=True)
+            last, last_time = self.stats["messages"], now
+
+    async def serve(self):
+        """Serve until cancelled"""
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(
+            lambda: SMTPProtocol(self), self.host, self.port, backlog=1024
+        )
+        self.running = True
+        tasks = []
+        if self.mailbox is not None:
+            tasks.append(asyncio.create_task(self._flush_mailbox()))
+        if self.quiet and self.report_interval:
+            tasks.append(asyncio.create_task(self._report()))
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self.running = False
+            for task in tasks:
+                task.cancel()
+            if self._pending:
+                self._save(self._pending)
+                self._pending = []
+
     def start(self):
         """Start the SMTP server"""
-        self.running = True
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
         try:
-            server_socket.bind((self.host, self.port))
-            server_socket.listen(5)
-            
             print("🚀 Simple SMTP Email Logger")
             print("="*80)
             print(f"📧 Listening on {self.host}:{self.port}")
-            print("💡 All emails will be printed below")
+            if self.quiet:
+                print("💡 Quiet mode: reporting messages/sec only")
+            else:
+                print("💡 All emails will be printed below")
             print("🔧 Press Ctrl+C to stop")
             print("="*80)
             print("\n✅ Ready! Waiting for emails...\n")
-            
-            while self.running:
-                try:
-                    server_socket.settimeout(1.0)
-                    client_socket, address = server_socket.accept()
-                    
-                    # Handle in separate thread
-                    thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, address)
-                    )
-                    thread.daemon = True
-                    thread.start()
-                    
-                except socket.timeout:
-                    continue
-                except KeyboardInterrupt:
-                    break
-                    
+            asyncio.run(self.serve())
+
+        except KeyboardInterrupt:
+            pass
         except OSError as e:
             if 'address already in use' in str(e).lower():
                 print(f"❌ Error: Port {self.port} is already in use!")
@@ -123,13 +281,18 @@ class SimpleEmailLogger:
             else:
                 print(f"❌ Error: {e}")
         finally:
-            self.running = False
-            server_socket.close()
             print("\n\n👋 SMTP server stopped")
 
 if __name__ == "__main__":
-    logger = SimpleEmailLogger()
-    try:
-        logger.start()
-    except KeyboardInterrupt:
-        print("\n👋 Shutting down...")
+    parser = argparse.ArgumentParser(description="Local SMTP sink that logs received emails")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--quiet", action="store_true", help="print throughput instead of every email")
+    parser.add_argument("--mbox", help="append received messages to this mbox file")
+    parser.add_argument("--maildir", help="store received messages in this Maildir")
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    logger = SimpleEmailLogger(args.host, args.port, quiet=args.quiet, mbox=args.mbox,
+                               maildir=args.maildir, report_interval=args.report_interval)
+    logger.start()